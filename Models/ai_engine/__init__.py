@@ -0,0 +1,26 @@
+"""
+CarbonCred AI engines.
+
+Importing ai_engine does no work: subpackages load on first attribute
+access (ai_engine.factors) or explicit import
+(from ai_engine.travel.business_travel import BusinessTravelEmissionModel),
+and only then pull in NumPy where they need it. Modules do nothing at
+import beyond defining their functions; demos run under __main__.
+
+The Django server puts Models/ on sys.path (config.settings.AI_ENGINE_DIR).
+"""
+
+import importlib
+
+__all__ = ["airports", "columns", "electricity", "factors", "fuel", "travel"]
+
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module(f"{__name__}.{name}")
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,156 @@
+"""
+IATA airport index and great-circle distances for the travel model.
+
+The bundled table (data/airports.csv) is read on the first airport lookup,
+never at import, so importing the travel model costs nothing at server
+startup. Codes resolve through a dict to a row of an (n, 2) coordinate
+array; distances for FREQUENT_ROUTES are computed once when the index
+loads and every other pair goes through the LRU-cached haversine_km.
+"""
+
+import csv
+import math
+import os
+from functools import lru_cache
+
+import numpy as np
+
+AIRPORTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "airports.csv")
+
+EARTH_RADIUS_KM = 6371
+
+# Distinct (origin, destination) coordinate pairs remembered by haversine_km;
+# travel exports repeat a few hundred routes.
+PAIR_CACHE_SIZE = 4096
+
+# Corporate routes precomputed when the index loads (both directions)
+FREQUENT_ROUTES = (
+    ("DEL", "BOM"), ("DEL", "BLR"), ("DEL", "HYD"), ("DEL", "MAA"),
+    ("DEL", "CCU"), ("DEL", "AMD"), ("DEL", "PNQ"), ("BOM", "BLR"),
+    ("BOM", "HYD"), ("BOM", "MAA"), ("BOM", "CCU"), ("BOM", "GOI"),
+    ("BLR", "HYD"), ("BLR", "MAA"), ("BLR", "CCU"), ("HYD", "MAA"),
+    ("DEL", "DXB"), ("BOM", "DXB"), ("BOM", "DOH"), ("DEL", "SIN"),
+    ("BOM", "SIN"), ("BLR", "SIN"), ("DEL", "LHR"), ("BOM", "LHR"),
+    ("DEL", "FRA"), ("DEL", "JFK"), ("BOM", "JFK"), ("BLR", "SFO"),
+)
+
+# ==============================
+# DISTANCES
+# ==============================
+
+@lru_cache(maxsize=PAIR_CACHE_SIZE)
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1 = math.radians(lat1), math.radians(lon1)
+    lat2, lon2 = math.radians(lat2), math.radians(lon2)
+
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+
+    a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+    return EARTH_RADIUS_KM * c
+
+
+def haversine_km_array(origins, dests):
+    """
+    Haversine over (n, 2) arrays of (lat, lon) in degrees.
+    """
+
+    lat1, lon1 = np.radians(origins[:, 0]), np.radians(origins[:, 1])
+    lat2, lon2 = np.radians(dests[:, 0]), np.radians(dests[:, 1])
+
+    a = np.sin((lat2 - lat1) / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2)**2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+    return EARTH_RADIUS_KM * c
+
+# ==============================
+# AIRPORT INDEX
+# ==============================
+
+class AirportIndex:
+    """
+    IATA code -> row of coords ((n, 2) float array of lat, lon).
+    """
+
+    __slots__ = ("codes", "rows", "coords", "points", "route_km")
+
+    def __init__(self, codes, coords, routes=FREQUENT_ROUTES):
+        self.codes = list(codes)
+        self.rows = {code: row for row, code in enumerate(self.codes)}
+        self.coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+
+        # Plain tuples for single lookups, which NumPy scalars would slow down
+        self.points = [tuple(point) for point in self.coords.tolist()]
+
+        # (origin row, dest row) -> km, same values as haversine_km
+        self.route_km = {}
+
+        for origin, dest in routes:
+            if origin in self.rows and dest in self.rows:
+                o, d = self.rows[origin], self.rows[dest]
+                self.route_km[o, d] = self.route_km[d, o] = haversine_km.__wrapped__(*self.points[o], *self.points[d])
+
+    @classmethod
+    def from_csv(cls, path=AIRPORTS_PATH, routes=FREQUENT_ROUTES):
+        with open(path, newline="", encoding="utf-8") as handle:
+            table = [(row["iata"], float(row["latitude"]), float(row["longitude"])) for row in csv.DictReader(handle)]
+
+        return cls([code for code, _, _ in table], [(lat, lon) for _, lat, lon in table], routes)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def row(self, code):
+        row = self.rows.get(code)
+
+        if row is None and isinstance(code, str):
+            row = self.rows.get(code.strip().upper())
+
+        if row is None:
+            raise ValueError(f"Unknown airport code: {code}")
+
+        return row
+
+    def coords_for(self, code):
+        return self.points[self.row(code)]
+
+    def rows_for(self, codes):
+        """
+        Row numbers for a sequence of codes, as an integer array.
+        """
+
+        codes = codes.tolist() if isinstance(codes, np.ndarray) else list(codes)
+
+        try:
+            return np.fromiter(map(self.rows.__getitem__, codes), dtype=np.intp, count=len(codes))
+        except KeyError:
+            # Lower-case, padded or unknown codes
+            return np.fromiter(map(self.row, codes), dtype=np.intp, count=len(codes))
+
+    def distance_km(self, origin, dest):
+        o, d = self.row(origin), self.row(dest)
+
+        distance = self.route_km.get((o, d))
+
+        if distance is None:
+            distance = haversine_km(*self.points[o], *self.points[d])
+
+        return distance
+
+
+_index = None
+
+
+def airport_index():
+    """
+    The bundled AirportIndex, loaded on first use.
+    """
+
+    global _index
+
+    if _index is None:
+        _index = AirportIndex.from_csv()
+
+    return _index
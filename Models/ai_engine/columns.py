@@ -0,0 +1,31 @@
+"""
+Column helpers shared by the batch engines (electricity.discom_batch,
+fuel.fuel_gs). A column is a list, a NumPy array, or anything np.asarray
+accepts.
+"""
+
+import numpy as np
+
+
+def as_list(values):
+    return values if isinstance(values, list) else np.asarray(values).tolist()
+
+
+def factorize(values):
+    """
+    (integer code per value, distinct values). Integer arrays go through
+    np.unique, giving sorted distinct values; anything else takes a dict
+    pass, which is cheaper for strings and keeps first-seen order.
+    """
+
+    if isinstance(values, np.ndarray) and values.dtype.kind in "iu":
+        distinct, codes = np.unique(values, return_inverse=True)
+        return codes, distinct.tolist()
+
+    values = as_list(values)
+
+    distinct = list(dict.fromkeys(values))
+    index = {value: code for code, value in enumerate(distinct)}
+
+    codes = np.fromiter(map(index.__getitem__, values), dtype=np.int64, count=len(values))
+    return codes, distinct
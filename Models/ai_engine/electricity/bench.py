@@ -0,0 +1,57 @@
+"""
+Microbenchmark for the electricity engine.
+
+    python -m ai_engine.electricity.bench [requests]
+
+"staged" calls the four public step functions the way run_electricity_ai
+used to, so every step re-runs the stages before it (validation and the
+base calculation ten times per request). "single-pass" is
+run_electricity_ai; "batch" is run_electricity_ai_batch over the whole set.
+"""
+
+import sys
+import time
+
+from ai_engine.electricity.engine import (
+    authenticate_auditor_emission,
+    calculate_ai_emission_range,
+    calculate_base_emission,
+    generate_risk_score,
+    run_electricity_ai,
+    run_electricity_ai_batch,
+)
+
+
+def _staged(data, auditor_emission_kg):
+    return (
+        calculate_base_emission(data),
+        calculate_ai_emission_range(data),
+        authenticate_auditor_emission(data, auditor_emission_kg),
+        generate_risk_score(data, auditor_emission_kg),
+    )
+
+
+def _timed(label, count, func):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+
+    print(f"{label:<12} {count:>8} requests  {count / elapsed:>12,.0f} req/s")
+    return elapsed
+
+
+def main(count=100000):
+    items = [
+        ({"kwh": 100 + i % 5000, "state": "MH", "period": "2025-Q1"}, 0.708 * (100 + i % 5000) * (0.9 + (i % 20) / 100))
+        for i in range(count)
+    ]
+
+    staged = _timed("staged", count, lambda: [_staged(data, kg) for data, kg in items])
+    single = _timed("single-pass", count, lambda: [run_electricity_ai(data, kg) for data, kg in items])
+    batch = _timed("batch", count, lambda: run_electricity_ai_batch(items))
+
+    print(f"single-pass speedup {staged / single:.1f}x, batch speedup {staged / batch:.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
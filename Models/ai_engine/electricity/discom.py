@@ -194,13 +194,23 @@ def detect_kwh_anomalies(discom_bills):
 def aggregate_discom_trust(
     continuity_result,
     kwh_comparison_result,
-    trend_result
+    trend_result=None,
+    kwh_state=None
 ):
     """
     Step 5:
     Aggregates all DISCOM verification signals into a single trust verdict.
+    The trend signal comes from trend_result, or from a meter's rolling
+    KwhSeriesState (kwh_anomaly.py) without re-reading its bill history;
+    one of the two is required.
     """
 
+    if trend_result is None:
+        if kwh_state is None:
+            raise ValueError("aggregate_discom_trust needs trend_result or kwh_state")
+
+        trend_result = kwh_state.trend_result()
+
     reasons = []
     risk_score = 0
 
@@ -0,0 +1,252 @@
+"""
+Columnar DISCOM bill analysis for many meters at once.
+
+Bills arrive as columns (a dict of lists or NumPy arrays, or any mapping
+whose values np.asarray accepts, such as a pyarrow Table) instead of a list
+of dicts per customer. Dates are parsed once for the whole batch, bills are
+sorted once by (meter, start date), and continuity gaps and period-over-
+period kWh changes are computed on adjacent rows of the sorted columns.
+Python only touches the rows that get flagged and one verdict per meter.
+
+The per-meter results are the same as running check_meter_and_continuity,
+detect_kwh_anomalies, compare_kwh_with_ai and aggregate_discom_trust on
+that meter's bills.
+"""
+
+import numpy as np
+
+from ai_engine.columns import as_list, factorize
+from ai_engine.electricity.discom import aggregate_discom_trust, compare_kwh_with_ai
+
+BILL_COLUMNS = (
+    "meter_number",
+    "billing_period_start",
+    "billing_period_end",
+    "kwh_billed",
+    "invoice_id",
+)
+
+ONE_DAY = np.timedelta64(1, "D")
+
+# detect_kwh_anomalies thresholds, on the change rounded to 2 decimals
+SUSPICIOUS_CHANGE = 20
+ANOMALOUS_CHANGE = 40
+
+
+def bills_to_columns(bills):
+    """
+    Converts a list of bill dicts to the column layout analyze_discom_batch takes.
+    """
+
+    return {column: [bill[column] for bill in bills] for column in BILL_COLUMNS}
+
+
+def _parse_dates(values):
+    """
+    ISO dates or datetimes to datetime64[s]. Plain dates parse much
+    faster at day precision, so that is tried first. datetime64 input is
+    used as is.
+    """
+
+    if isinstance(values, np.ndarray) and values.dtype.kind == "M":
+        return values.astype("datetime64[s]")
+
+    try:
+        return np.array(values, dtype="datetime64[D]").astype("datetime64[s]")
+    except ValueError:
+        pass
+
+    try:
+        return np.array(values, dtype="datetime64[s]")
+    except ValueError:
+        raise ValueError("Invalid date format in DISCOM bill")
+
+
+def _load_columns(bills, group_by):
+
+    for column in BILL_COLUMNS:
+        if column not in bills:
+            raise ValueError(f"Missing DISCOM field: {column}")
+
+    # String columns stay Python lists: they are only compared through
+    # their factorized codes and read back for flagged rows.
+    columns = {column: as_list(bills[column]) for column in ("meter_number", "invoice_id", "kwh_billed")}
+
+    columns["meter"], meters = factorize(bills["meter_number"])
+
+    if group_by == "meter_number":
+        columns["group"], columns["groups"] = columns["meter"], meters
+    else:
+        columns["group"], columns["groups"] = factorize(bills[group_by])
+
+    columns["start"] = _parse_dates(bills["billing_period_start"])
+    columns["end"] = _parse_dates(bills["billing_period_end"])
+
+    columns["kwh"] = np.asarray(bills["kwh_billed"], dtype=np.float64)
+
+    # validate_discom_bill, for every row at once
+    bad = np.flatnonzero(columns["kwh"] <= 0)
+    if len(bad):
+        raise ValueError(f"DISCOM kWh must be greater than zero ({columns['invoice_id'][bad[0]]})")
+
+    bad = np.flatnonzero(columns["start"] >= columns["end"])
+    if len(bad):
+        raise ValueError(f"Invalid DISCOM billing period ({columns['invoice_id'][bad[0]]})")
+
+    return columns
+
+
+def _change_percent(prev_kwh, curr_kwh):
+    return round(((curr_kwh - prev_kwh) / prev_kwh) * 100, 2)
+
+
+def analyze_discom_batch(bills, ai_kwh=None, group_by="meter_number"):
+    """
+    Analyzes bills for many meters in one pass.
+
+    bills:    columns meter_number, billing_period_start, billing_period_end,
+              kwh_billed, invoice_id (plus the group_by column if different).
+    ai_kwh:   optional {group: AI-reported kWh}, compared against the
+              group's latest bill. Groups without one add no kWh risk.
+    group_by: column identifying a customer. The default groups by meter,
+              so meter_mismatch can only fire when grouping by something
+              else (e.g. an account id).
+
+    Returns {group: {"continuity", "trend", "kwh_comparison", "verdict"}}.
+    """
+
+    ai_kwh = ai_kwh or {}
+
+    columns = _load_columns(bills, group_by)
+
+    groups = columns["groups"]
+
+    # Stable, so bills with equal start dates keep their input order as in sorted()
+    order = np.lexsort((columns["start"], columns["group"]))
+
+    codes = columns["group"][order]
+    start = columns["start"][order]
+    end = columns["end"][order]
+    kwh = columns["kwh"][order]
+    meter_codes = columns["meter"][order]
+
+    counts = np.bincount(codes, minlength=len(groups))
+    first = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    # Row i pairs bill i with bill i + 1 of the same group
+    same_group = codes[1:] == codes[:-1]
+
+    expected_start = end[:-1] + ONE_DAY
+    gap = same_group & (start[1:] != expected_start)
+
+    mismatch = same_group & (meter_codes[1:] != meter_codes[first[codes[1:]]])
+
+    # Rounding decides the thresholds, so exact Python rounding is only
+    # applied to pairs near or above them.
+    raw_change = np.abs((kwh[1:] - kwh[:-1]) / kwh[:-1] * 100)
+    trend_pairs = same_group & (counts[codes[1:]] >= 3) & (raw_change > SUSPICIOUS_CHANGE - 0.01)
+
+    # Flagged rows and per-group values are read from plain lists;
+    # position i in sorted order is input row order[i].
+    order_list = order.tolist()
+    codes_list = codes.tolist()
+    counts_list = counts.tolist()
+    first_list = first.tolist()
+
+    def row(column, i):
+        return columns[column][order_list[i]]
+
+    issues = {}
+    anomalies = {}
+
+    # Same text as datetime.isoformat() at second precision
+    gap_rows = np.flatnonzero(gap)
+    gap_dates = dict(zip(
+        gap_rows.tolist(),
+        zip(
+            np.datetime_as_string(expected_start[gap_rows]).tolist(),
+            np.datetime_as_string(start[gap_rows + 1]).tolist()
+        )
+    ))
+
+    for i in np.flatnonzero(mismatch | gap).tolist():
+        group_issues = issues.setdefault(codes_list[i], [])
+
+        if mismatch[i]:
+            group_issues.append({
+                "type": "meter_mismatch",
+                "expected": row("meter_number", first_list[codes_list[i]]),
+                "found": row("meter_number", i + 1),
+                "invoice_id": row("invoice_id", i + 1)
+            })
+
+        if gap[i]:
+            group_issues.append({
+                "type": "billing_gap",
+                "previous_invoice": row("invoice_id", i),
+                "current_invoice": row("invoice_id", i + 1),
+                "expected_start": gap_dates[i][0],
+                "found_start": gap_dates[i][1]
+            })
+
+    for i in np.flatnonzero(trend_pairs).tolist():
+        change_percent = _change_percent(row("kwh_billed", i), row("kwh_billed", i + 1))
+
+        if abs(change_percent) <= SUSPICIOUS_CHANGE:
+            continue
+
+        anomalies.setdefault(codes_list[i], []).append({
+            "from_invoice": row("invoice_id", i),
+            "to_invoice": row("invoice_id", i + 1),
+            "change_percent": change_percent,
+            "severity": "suspicious" if abs(change_percent) <= ANOMALOUS_CHANGE else "anomalous"
+        })
+
+    results = {}
+
+    for code, group in enumerate(groups):
+
+        if counts_list[code] < 2:
+            continuity = {
+                "status": "insufficient_data",
+                "explanation": "At least 2 DISCOM bills required for continuity check"
+            }
+        elif code in issues:
+            continuity = {"status": "issues_detected", "issues": issues[code]}
+        else:
+            continuity = {
+                "status": "continuous",
+                "explanation": "Meter number consistent and billing periods continuous"
+            }
+
+        if counts_list[code] < 3:
+            trend = {
+                "status": "insufficient_data",
+                "explanation": "At least 3 months of data required for trend analysis"
+            }
+        elif code in anomalies:
+            trend = {"status": "anomalies_detected", "anomalies": anomalies[code]}
+        else:
+            trend = {
+                "status": "stable",
+                "explanation": "No abnormal kWh trends detected across billing periods"
+            }
+
+        kwh_comparison = None
+
+        if group in ai_kwh:
+            latest = first_list[code] + counts_list[code] - 1
+            kwh_comparison = compare_kwh_with_ai({"kwh_billed": row("kwh_billed", latest)}, {"kwh": ai_kwh[group]})
+
+        results[group] = {
+            "continuity": continuity,
+            "trend": trend,
+            "kwh_comparison": kwh_comparison,
+            "verdict": aggregate_discom_trust(
+                continuity,
+                kwh_comparison or {"risk_level": None},
+                trend
+            )
+        }
+
+    return results
@@ -0,0 +1,336 @@
+"""
+Streaming ingestion of DISCOM bill exports (CSV or JSONL).
+
+Rows are read lazily, validated in chunks with validate_discom_bill and fed
+into per-meter running checks that keep only the previous bill of each
+meter. Memory therefore depends on the number of meters and findings,
+not on the file size. Bad rows are collected as errors (capped at
+max_errors) instead of stopping the run.
+
+The running checks assume each meter's bills appear in billing order, as
+utility exports list them. A bill starting before the previous one of the
+same meter is reported as a row error and left out of the checks.
+
+    python -m ai_engine.electricity.discom_stream bills.csv
+"""
+
+import csv
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from itertools import islice
+
+from ai_engine.electricity.discom import aggregate_discom_trust, validate_discom_bill
+
+INGEST_CHUNK_SIZE = 10000
+
+# Errors kept in the summary; the total is always counted.
+MAX_REPORTED_ERRORS = 1000
+
+# ==============================
+# READERS
+# ==============================
+#
+# Both readers yield (line_number, bill, error); exactly one of bill and
+# error is set.
+
+def _number(value):
+    if isinstance(value, (int, float)):
+        return value
+
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return float(value)
+
+
+def read_bills_csv(lines):
+    """
+    lines: an open text file (or any iterable of lines) with a header row.
+    """
+
+    reader = csv.DictReader(lines)
+
+    for row in reader:
+        try:
+            row["kwh_billed"] = _number(row.get("kwh_billed"))
+        except (TypeError, ValueError):
+            yield reader.line_num, None, "kwh_billed must be a number"
+            continue
+
+        yield reader.line_num, row, None
+
+
+def read_bills_jsonl(lines):
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+
+        try:
+            bill = json.loads(line)
+        except ValueError:
+            yield line_number, None, "Invalid JSON"
+            continue
+
+        if not isinstance(bill, dict):
+            yield line_number, None, "Row must be a JSON object"
+            continue
+
+        yield line_number, bill, None
+
+
+def read_bills(path):
+    """
+    Picks the reader from the file extension (.jsonl / .ndjson, else CSV).
+    """
+
+    with open(path, newline="", encoding="utf-8") as lines:
+        if path.endswith((".jsonl", ".ndjson")):
+            yield from read_bills_jsonl(lines)
+        else:
+            yield from read_bills_csv(lines)
+
+
+def chunks(iterable, size):
+    iterator = iter(iterable)
+
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def validate_chunk(rows):
+    """
+    Splits a chunk of reader rows into (valid bills, errors).
+    """
+
+    valid = []
+    errors = []
+
+    for line_number, bill, error in rows:
+        if error is None:
+            try:
+                validate_discom_bill(bill)
+            except (TypeError, ValueError) as exc:
+                error = str(exc)
+
+        if error is None:
+            valid.append((line_number, bill))
+        else:
+            errors.append({
+                "line": line_number,
+                "invoice_id": bill.get("invoice_id") if bill else None,
+                "error": error
+            })
+
+    return valid, errors
+
+# ==============================
+# RUNNING CHECKS
+# ==============================
+
+class _MeterState:
+    __slots__ = ("meter", "count", "prev_start", "prev_end", "prev_kwh", "prev_invoice", "issues", "anomalies")
+
+    def __init__(self, meter):
+        self.meter = meter
+        self.count = 0
+        self.prev_start = None
+        self.prev_end = None
+        self.prev_kwh = None
+        self.prev_invoice = None
+        self.issues = []
+        self.anomalies = []
+
+
+class DiscomStreamChecker:
+    """
+    check_meter_and_continuity and detect_kwh_anomalies, updated one bill
+    at a time. results() gives the same per-group output as running those
+    functions (and aggregate_discom_trust) on each group's bills.
+    """
+
+    def __init__(self, group_by="meter_number"):
+        self.group_by = group_by
+        self.states = {}
+
+    def add(self, bill):
+        """
+        Feeds one validated bill. Returns an error message when the bill
+        cannot join its group (missing or bad group key, out of order,
+        naive and aware dates mixed), else None.
+        """
+
+        start = datetime.fromisoformat(bill["billing_period_start"])
+        end = datetime.fromisoformat(bill["billing_period_end"])
+
+        if self.group_by not in bill:
+            return f"Missing required field: {self.group_by}"
+
+        key = bill[self.group_by]
+
+        # JSONL rows can carry lists or objects here
+        if not isinstance(key, (str, int, float)):
+            return f"{self.group_by} must be a string or number"
+
+        state = self.states.get(key)
+
+        if state is None:
+            state = self.states[key] = _MeterState(bill["meter_number"])
+
+        if state.count:
+            # Naive and offset-aware datetimes cannot be compared
+            if (start.tzinfo is None) != (state.prev_start.tzinfo is None):
+                return "Billing dates mix timezone-aware and naive values for its meter"
+
+            if start < state.prev_start:
+                return "Bill out of billing order for its meter"
+
+            if bill["meter_number"] != state.meter:
+                state.issues.append({
+                    "type": "meter_mismatch",
+                    "expected": state.meter,
+                    "found": bill["meter_number"],
+                    "invoice_id": bill["invoice_id"]
+                })
+
+            expected_start = state.prev_end + timedelta(days=1)
+
+            if start != expected_start:
+                state.issues.append({
+                    "type": "billing_gap",
+                    "previous_invoice": state.prev_invoice,
+                    "current_invoice": bill["invoice_id"],
+                    "expected_start": expected_start.isoformat(),
+                    "found_start": start.isoformat()
+                })
+
+            change_percent = round(
+                ((bill["kwh_billed"] - state.prev_kwh) / state.prev_kwh) * 100,
+                2
+            )
+
+            if abs(change_percent) > 20:
+                state.anomalies.append({
+                    "from_invoice": state.prev_invoice,
+                    "to_invoice": bill["invoice_id"],
+                    "change_percent": change_percent,
+                    "severity": "suspicious" if abs(change_percent) <= 40 else "anomalous"
+                })
+
+        state.count += 1
+        state.prev_start = start
+        state.prev_end = end
+        state.prev_kwh = bill["kwh_billed"]
+        state.prev_invoice = bill["invoice_id"]
+
+        return None
+
+    def results(self):
+        results = {}
+
+        for key, state in self.states.items():
+
+            if state.count < 2:
+                continuity = {
+                    "status": "insufficient_data",
+                    "explanation": "At least 2 DISCOM bills required for continuity check"
+                }
+            elif state.issues:
+                continuity = {"status": "issues_detected", "issues": state.issues}
+            else:
+                continuity = {
+                    "status": "continuous",
+                    "explanation": "Meter number consistent and billing periods continuous"
+                }
+
+            if state.count < 3:
+                trend = {
+                    "status": "insufficient_data",
+                    "explanation": "At least 3 months of data required for trend analysis"
+                }
+            elif state.anomalies:
+                trend = {"status": "anomalies_detected", "anomalies": state.anomalies}
+            else:
+                trend = {
+                    "status": "stable",
+                    "explanation": "No abnormal kWh trends detected across billing periods"
+                }
+
+            results[key] = {
+                "continuity": continuity,
+                "trend": trend,
+                # No AI-reported kWh in a utility export
+                "verdict": aggregate_discom_trust(continuity, {"risk_level": None}, trend)
+            }
+
+        return results
+
+# ==============================
+# INGESTION
+# ==============================
+
+def ingest_discom_rows(rows, chunk_size=INGEST_CHUNK_SIZE, max_errors=MAX_REPORTED_ERRORS, group_by="meter_number"):
+    """
+    Runs reader rows through validation and the running checks.
+    Returns a summary with row counts, errors, rows_per_second and the
+    per-meter results.
+    """
+
+    checker = DiscomStreamChecker(group_by)
+
+    summary = {
+        "rows": 0,
+        "valid": 0,
+        "error_count": 0,
+        "errors": [],
+    }
+
+    def report(errors):
+        summary["error_count"] += len(errors)
+        room = max_errors - len(summary["errors"])
+        summary["errors"].extend(errors[:max(room, 0)])
+
+    started = time.perf_counter()
+
+    for chunk in chunks(rows, chunk_size):
+        valid, errors = validate_chunk(chunk)
+        report(errors)
+
+        for line_number, bill in valid:
+            error = checker.add(bill)
+
+            if error:
+                report([{"line": line_number, "invoice_id": bill["invoice_id"], "error": error}])
+            else:
+                summary["valid"] += 1
+
+        summary["rows"] += len(chunk)
+
+    elapsed = time.perf_counter() - started
+
+    summary["seconds"] = round(elapsed, 3)
+    summary["rows_per_second"] = round(summary["rows"] / elapsed) if elapsed else None
+    summary["meters"] = checker.results()
+
+    return summary
+
+
+def ingest_discom_file(path, **options):
+    return ingest_discom_rows(read_bills(path), **options)
+
+
+if __name__ == "__main__":
+    summary = ingest_discom_file(sys.argv[1])
+
+    flagged = sum(1 for result in summary["meters"].values() if result["verdict"]["trust_level"] != "high")
+
+    print(
+        f"{summary['rows']} rows ({summary['valid']} valid, {summary['error_count']} errors) "
+        f"in {summary['seconds']}s, {summary['rows_per_second']:,} rows/s; "
+        f"{len(summary['meters'])} meters, {flagged} below high trust"
+    )
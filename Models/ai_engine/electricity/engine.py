@@ -1,7 +1,54 @@
+import numbers
+
+from ai_engine.electricity.grid_factors import grid_factor, grid_factor_table, period_year, state_name
 from ai_engine.electricity.schema import validate_electricity_input
 
+# Uncertainty tolerance of the AI emission range (±7%)
+AI_RANGE_TOLERANCE = 0.07
 
-def calculate_base_emission(data):
+# (max |deviation %|, risk score), checked in order; anything above scores MAX_RISK_SCORE
+RISK_SCORE_BANDS = ((5, 10), (10, 30), (20, 60))
+MAX_RISK_SCORE = 85
+
+
+def is_real_number(value) -> bool:
+    # NumPy scalars are numbers.Real; bool is an int but not a quantity
+    return isinstance(value, numbers.Real) and not isinstance(value, bool)
+
+
+def plain_number(value):
+    # NumPy scalars back to int/float, so results stay JSON-serializable
+    return int(value) if isinstance(value, numbers.Integral) else float(value)
+
+
+class ElectricityAnalysis:
+    """
+    Intermediate result passed once through the pipeline stages.
+    Each stage reads the previous stage's output and fills its own field,
+    so input validation and the base calculation run once per request.
+    """
+
+    __slots__ = (
+        "data", "auditor_emission_kg", "emission_factor", "factor_version",
+        "regional_factor", "base", "ai_range", "auth", "risk"
+    )
+
+    def __init__(self, data, auditor_emission_kg=None, emission_factor=None):
+        self.data = data
+        self.auditor_emission_kg = auditor_emission_kg
+
+        # (value, version[, regional]); looked up by the base stage when not given
+        emission_factor = tuple(emission_factor or (None, None))
+        self.emission_factor, self.factor_version = emission_factor[:2]
+        self.regional_factor = len(emission_factor) > 2 and emission_factor[2]
+
+        self.base = None
+        self.ai_range = None
+        self.auth = None
+        self.risk = None
+
+
+def _base_stage(analysis):
     """
     Step 3:
     Converts electricity consumption (kWh)
@@ -9,56 +56,70 @@ def calculate_base_emission(data):
     """
 
     # 1. Validate input first (MANDATORY)
-    validate_electricity_input(data)
+    validate_electricity_input(analysis.data)
 
-    # 2. India average grid emission factor
-    # kg CO2 per kWh
-    EMISSION_FACTOR = 0.708
+    # 2. Grid emission factor for the state and billing month, or the
+    # India average where no state factor is recorded (kg CO2 per kWh)
+    if analysis.emission_factor is None:
+        analysis.emission_factor, analysis.factor_version, analysis.regional_factor = grid_factor(
+            analysis.data["state"], analysis.data["period"]
+        )
 
     # 3. Core calculation
-    kwh = data["kwh"]
-    emission_kg = kwh * EMISSION_FACTOR
+    kwh = analysis.data["kwh"]
+    emission_kg = kwh * analysis.emission_factor
 
     # 4. Return clean, explainable output
-    return {
+    analysis.base = {
         "calculated_emission_kg": round(emission_kg, 2),
-        "emission_factor_used": EMISSION_FACTOR,
-        "method": "india_grid_average_v1"
+        "emission_factor_used": analysis.emission_factor,
+        "emission_factor_version": analysis.factor_version,
+        "method": "state_grid_monthly_v1" if analysis.regional_factor else "india_grid_average_v1"
     }
 
-def calculate_ai_emission_range(data):
+
+def _range_stage(analysis):
     """
     Step 4:
     Generates an AI emission range around the base emission.
     """
 
-    base_result = calculate_base_emission(data)
-    base_emission = base_result["calculated_emission_kg"]
+    base_emission = analysis.base["calculated_emission_kg"]
 
-    # Uncertainty tolerance (±7%)
-    TOLERANCE = 0.07
+    lower = base_emission * (1 - AI_RANGE_TOLERANCE)
+    upper = base_emission * (1 + AI_RANGE_TOLERANCE)
 
-    lower = base_emission * (1 - TOLERANCE)
-    upper = base_emission * (1 + TOLERANCE)
+    if analysis.regional_factor:
+        grid = f"{state_name(analysis.data['state'])} state grid emission factor"
+    else:
+        grid = "India grid emission factor"
 
-    return {
+    analysis.ai_range = {
         "calculated_emission_kg": base_emission,
         "ai_emission_range": {
             "lower": round(lower, 2),
             "upper": round(upper, 2)
         },
         "model_version": "electricity_range_v1",
-        "explanation": "Calculated using India grid emission factor with ±7% uncertainty"
+        "explanation": f"Calculated using {grid} with ±7% uncertainty"
     }
 
-def authenticate_auditor_emission(data, auditor_emission_kg):
+
+def _auth_stage(analysis):
     """
     Step 5:
     Compares auditor-reported emission
     against AI-generated emission range.
     """
 
-    ai_result = calculate_ai_emission_range(data)
+    auditor_emission_kg = analysis.auditor_emission_kg
+    ai_result = analysis.ai_range
+
+    if not is_real_number(auditor_emission_kg):
+        raise ValueError("auditor_emission_kg must be a number")
+
+    auditor_emission_kg = plain_number(auditor_emission_kg)
+
     lower = ai_result["ai_emission_range"]["lower"]
     upper = ai_result["ai_emission_range"]["upper"]
 
@@ -75,7 +136,7 @@ def authenticate_auditor_emission(data, auditor_emission_kg):
         / ai_result["calculated_emission_kg"]
     ) * 100
 
-    return {
+    analysis.auth = {
         "auditor_emission_kg": auditor_emission_kg,
         "ai_range": {
             "lower": lower,
@@ -88,27 +149,26 @@ def authenticate_auditor_emission(data, auditor_emission_kg):
         "explanation": "Auditor value compared against AI emission range"
     }
 
-def generate_risk_score(data, auditor_emission_kg):
+
+def _risk_stage(analysis):
     """
     Step 6:
     Converts auditor deviation into a numeric risk score (0–100).
     """
 
-    auth_result = authenticate_auditor_emission(data, auditor_emission_kg)
+    auth_result = analysis.auth
 
     deviation = abs(auth_result["deviation_percent"])
 
     # Base risk logic (simple & explainable)
-    if deviation <= 5:
-        risk_score = 10
-    elif deviation <= 10:
-        risk_score = 30
-    elif deviation <= 20:
-        risk_score = 60
-    else:
-        risk_score = 85
+    risk_score = MAX_RISK_SCORE
 
-    return {
+    for max_deviation, band_score in RISK_SCORE_BANDS:
+        if deviation <= max_deviation:
+            risk_score = band_score
+            break
+
+    analysis.risk = {
         "risk_score": risk_score,
         "risk_level": auth_result["risk_level"],
         "deviation_percent": auth_result["deviation_percent"],
@@ -116,17 +176,58 @@ def generate_risk_score(data, auditor_emission_kg):
         "explanation": "Risk score derived from auditor deviation against AI emission range"
     }
 
-def run_electricity_ai(data, auditor_emission_kg):
+
+PIPELINE = (_base_stage, _range_stage, _auth_stage, _risk_stage)
+
+
+def analyze_electricity(data, auditor_emission_kg=None, stages=len(PIPELINE), emission_factor=None):
     """
-    Step 7:
-    Master entry-point for electricity AI.
-    This is the ONLY function the backend should call.
+    Runs the first `stages` pipeline stages once and returns the
+    ElectricityAnalysis holding every intermediate result.
+    """
+
+    analysis = ElectricityAnalysis(data, auditor_emission_kg, emission_factor)
+
+    for stage in PIPELINE[:stages]:
+        stage(analysis)
+
+    return analysis
+
+
+def calculate_base_emission(data):
+    """
+    Step 3: base CO2 emissions (kg) for the given consumption.
+    """
+
+    return analyze_electricity(data, stages=1).base
+
+
+def calculate_ai_emission_range(data):
+    """
+    Step 4: AI emission range around the base emission.
+    """
+
+    return analyze_electricity(data, stages=2).ai_range
+
+
+def authenticate_auditor_emission(data, auditor_emission_kg):
     """
+    Step 5: auditor-reported emission checked against the AI range.
+    """
+
+    return analyze_electricity(data, auditor_emission_kg, stages=3).auth
+
+
+def generate_risk_score(data, auditor_emission_kg):
+    """
+    Step 6: numeric risk score (0–100) from the auditor deviation.
+    """
+
+    return analyze_electricity(data, auditor_emission_kg).risk
 
-    base = calculate_base_emission(data)
-    ai_range = calculate_ai_emission_range(data)
-    auth = authenticate_auditor_emission(data, auditor_emission_kg)
-    risk = generate_risk_score(data, auditor_emission_kg)
+
+def _electricity_report(analysis):
+    data = analysis.data
 
     return {
         "input": {
@@ -134,9 +235,52 @@ def run_electricity_ai(data, auditor_emission_kg):
             "state": data["state"],
             "period": data["period"]
         },
-        "base_emission": base,
-        "ai_emission_analysis": ai_range,
-        "auditor_authentication": auth,
-        "risk_assessment": risk,
+        "base_emission": analysis.base,
+        "ai_emission_analysis": analysis.ai_range,
+        "auditor_authentication": analysis.auth,
+        "risk_assessment": analysis.risk,
         "ai_engine_version": "electricity_engine_v1"
     }
+
+
+def run_electricity_ai(data, auditor_emission_kg):
+    """
+    Step 7:
+    Master entry-point for electricity AI.
+    This is the ONLY function the backend should call.
+    """
+
+    return _electricity_report(analyze_electricity(data, auditor_emission_kg))
+
+
+def run_electricity_ai_batch(items):
+    """
+    Scores a list of (data, auditor_emission_kg) pairs.
+    Each year's grid factor table is fetched once for the whole batch.
+    Returns one result per pair, in order; a pair that fails validation
+    gets {"error": message} instead of stopping the batch.
+    """
+
+    tables = {}
+
+    results = []
+
+    for data, auditor_emission_kg in items:
+        try:
+            emission_factor = None
+
+            if isinstance(data, dict):
+                year = period_year(data.get("period"))
+
+                if year not in tables:
+                    tables[year] = grid_factor_table(year)
+
+                emission_factor = tables[year].lookup(data.get("state"), data.get("period"))
+            analysis = analyze_electricity(data, auditor_emission_kg, emission_factor=emission_factor)
+        except (ValueError, ZeroDivisionError) as exc:
+            results.append({"error": str(exc)})
+            continue
+
+        results.append(_electricity_report(analysis))
+
+    return results
@@ -0,0 +1,359 @@
+"""
+Grid emission factors per Indian state and month.
+
+Each year has a table: an array with one row per state (plus a national
+fallback row) and one column per period slot: the 12 months, the 4
+quarters (mean of their months) and the year (mean of all months). It is
+built from the factor rows valid in that year (ai_engine.factors
+.get_grid_factor_rows; in the server, EmissionFactor rows with regions such
+as "IN-MH", and "IN" for the national factor of each month), and rebuilt
+only when the factors change. Cells without a state factor hold the
+national one.
+
+A lookup picks the table of the period's year, then two integer indexes
+into its array. States are interned to row numbers and periods to slots;
+batch lookups intern the distinct values once (np.unique) and gather all
+rows of a year in NumPy.
+"""
+
+import re
+
+import numpy as np
+
+from ai_engine.factors import factor_generation, get_factor, get_grid_factor_rows
+
+# ISO 3166-2:IN state and union territory codes
+STATE_NAMES = {
+    "AN": "Andaman and Nicobar Islands",
+    "AP": "Andhra Pradesh",
+    "AR": "Arunachal Pradesh",
+    "AS": "Assam",
+    "BR": "Bihar",
+    "CH": "Chandigarh",
+    "CG": "Chhattisgarh",
+    "DH": "Dadra and Nagar Haveli and Daman and Diu",
+    "DL": "Delhi",
+    "GA": "Goa",
+    "GJ": "Gujarat",
+    "HR": "Haryana",
+    "HP": "Himachal Pradesh",
+    "JK": "Jammu and Kashmir",
+    "JH": "Jharkhand",
+    "KA": "Karnataka",
+    "KL": "Kerala",
+    "LA": "Ladakh",
+    "LD": "Lakshadweep",
+    "MP": "Madhya Pradesh",
+    "MH": "Maharashtra",
+    "MN": "Manipur",
+    "ML": "Meghalaya",
+    "MZ": "Mizoram",
+    "NL": "Nagaland",
+    "OD": "Odisha",
+    "PY": "Puducherry",
+    "PB": "Punjab",
+    "RJ": "Rajasthan",
+    "SK": "Sikkim",
+    "TN": "Tamil Nadu",
+    "TG": "Telangana",
+    "TR": "Tripura",
+    "UP": "Uttar Pradesh",
+    "UK": "Uttarakhand",
+    "WB": "West Bengal",
+}
+
+# Codes replaced in later ISO revisions
+STATE_ALIASES = {"CT": "CG", "OR": "OD", "TS": "TG", "UT": "UK", "DN": "DH", "DD": "DH"}
+
+STATE_CODES = tuple(STATE_NAMES)
+
+# Row for unknown states: the national factor
+NATIONAL_ROW = len(STATE_CODES)
+
+# State code of factor rows giving the national factor for a month
+NATIONAL_STATE = "IN"
+
+# Year tables kept at once; the oldest built is dropped first
+GRID_TABLE_CACHE_YEARS = 16
+
+QUARTER_SLOT = 12
+ANNUAL_SLOT = 16
+PERIOD_SLOTS = 17
+
+_QUARTER_PERIOD = re.compile(r"^\d{4}-?Q([1-4])$", re.IGNORECASE)
+_MONTH_PERIOD = re.compile(r"^\d{4}-(\d{2})(-\d{2})?$")
+_PERIOD_YEAR = re.compile(r"^(\d{4})")
+
+
+def _build_state_rows():
+    rows = {}
+
+    for row, code in enumerate(STATE_CODES):
+        rows[code] = row
+        rows[STATE_NAMES[code].upper()] = row
+        rows[f"IN-{code}"] = row
+
+    for alias, code in STATE_ALIASES.items():
+        rows[alias] = rows[f"IN-{alias}"] = rows[code]
+
+    return rows
+
+
+# Normalized state text -> row number
+_STATE_ROWS = _build_state_rows()
+
+
+def state_row(state):
+    """
+    Row number for a state code ("MH", "IN-MH") or name ("Maharashtra");
+    NATIONAL_ROW when unknown.
+    """
+
+    if not isinstance(state, str):
+        return NATIONAL_ROW
+
+    return _STATE_ROWS.get(state.strip().upper(), NATIONAL_ROW)
+
+
+def period_slot(period):
+    """
+    Column for "2025-04" / "2025-04-01" (month), "2025-Q2" (quarter); any
+    other period uses the annual column.
+    """
+
+    if not isinstance(period, str):
+        return ANNUAL_SLOT
+
+    period = period.strip()
+
+    match = _QUARTER_PERIOD.match(period)
+    if match:
+        return QUARTER_SLOT + int(match.group(1)) - 1
+
+    match = _MONTH_PERIOD.match(period)
+    if match and 1 <= int(match.group(1)) <= 12:
+        return int(match.group(1)) - 1
+
+    return ANNUAL_SLOT
+
+
+def state_name(state):
+    """
+    Name of a state ("Maharashtra" for "IN-MH"); None when unknown.
+    """
+
+    row = state_row(state)
+
+    return None if row == NATIONAL_ROW else STATE_NAMES[STATE_CODES[row]]
+
+
+def period_year(period):
+    """
+    Year a period starts with ("2023-03" -> 2023); None when it has none,
+    which means the current year's factors.
+    """
+
+    if not isinstance(period, str):
+        return None
+
+    match = _PERIOD_YEAR.match(period.strip())
+
+    return int(match.group(1)) if match else None
+
+
+def _interned(values, resolve):
+    if isinstance(values, np.ndarray) and values.dtype.kind in "iu":
+        return values
+
+    # Non-text values resolve like they do in lookup (national row, annual
+    # slot); "" stands in for them so one bad record cannot break the array.
+    values = [value if isinstance(value, str) else "" for value in values]
+
+    distinct, index = np.unique(np.array(values, dtype=str), return_inverse=True)
+
+    return np.array([resolve(value) for value in distinct.tolist()], dtype=np.intp)[index]
+
+
+def intern_states(states):
+    """
+    state_row for a sequence of states, as an integer array. Each distinct
+    value is resolved once; callers scoring the same sites repeatedly can
+    keep the result and pass it to lookup_many.
+    """
+
+    return _interned(states, state_row)
+
+
+def intern_periods(periods):
+    """
+    period_slot for a sequence of periods, as an integer array.
+    """
+
+    return _interned(periods, period_slot)
+
+
+def intern_years(periods):
+    """
+    period_year for a sequence of periods, as an integer array; 0 stands
+    for None.
+    """
+
+    return _interned(periods, lambda period: period_year(period) or 0)
+
+
+class GridFactorTable:
+    """
+    values[row, slot] in kg CO2e per kWh; versions[version_codes[row, slot]]
+    is the factor version of that cell.
+    """
+
+    __slots__ = ("national", "values", "version_codes", "versions", "regional", "generation")
+
+    def __init__(self, national, state_rows=(), generation=None):
+        """
+        national: (value, version) for months without a NATIONAL_STATE
+        row; state_rows: (state, month, value, version) for one year.
+        """
+
+        self.national = national = tuple(national)
+        national_value, national_version = national
+
+        self.versions = [national_version]
+        version_index = {national_version: 0}
+
+        def version_code(version):
+            if version not in version_index:
+                version_index[version] = len(self.versions)
+                self.versions.append(version)
+
+            return version_index[version]
+
+        monthly = np.full((NATIONAL_ROW + 1, 12), float(national_value))
+        monthly_versions = np.zeros((NATIONAL_ROW + 1, 12), dtype=np.int64)
+        monthly_regional = np.zeros((NATIONAL_ROW + 1, 12), dtype=bool)
+
+        state_rows = [row for row in state_rows if 1 <= row[1] <= 12]
+
+        # National months first: they fill every state without its own factor
+        for state, month, value, version in state_rows:
+            if isinstance(state, str) and state.strip().upper() == NATIONAL_STATE:
+                monthly[:, month - 1] = value
+                monthly_versions[:, month - 1] = version_code(version)
+
+        for state, month, value, version in state_rows:
+            row = state_row(state)
+            if row == NATIONAL_ROW:
+                continue
+
+            monthly[row, month - 1] = value
+            monthly_versions[row, month - 1] = version_code(version)
+            monthly_regional[row, month - 1] = True
+
+        self.values = np.empty((NATIONAL_ROW + 1, PERIOD_SLOTS))
+        self.version_codes = np.empty((NATIONAL_ROW + 1, PERIOD_SLOTS), dtype=np.int64)
+
+        self.values[:, :12] = monthly
+        self.version_codes[:, :12] = monthly_versions
+
+        # Quarters and the year average their months (exactly the month
+        # value when they agree); their version lists every version among
+        # those months.
+        spans = [(QUARTER_SLOT + q, range(3 * q, 3 * q + 3)) for q in range(4)] + [(ANNUAL_SLOT, range(12))]
+
+        for slot, months in spans:
+            block = monthly[:, list(months)]
+            self.values[:, slot] = np.where(block.min(axis=1) == block.max(axis=1), block[:, 0], block.mean(axis=1))
+
+            for row in range(NATIONAL_ROW + 1):
+                version = ",".join(sorted({self.versions[code] for code in monthly_versions[row, list(months)].tolist()}))
+                self.version_codes[row, slot] = version_code(version)
+
+        # Cells using a state factor, for at least one month of their span
+        self.regional = np.empty((NATIONAL_ROW + 1, PERIOD_SLOTS), dtype=bool)
+        self.regional[:, :12] = monthly_regional
+
+        for slot, months in spans:
+            self.regional[:, slot] = monthly_regional[:, list(months)].any(axis=1)
+
+        self.generation = generation
+
+    def lookup(self, state, period):
+        """
+        (value, version, regional) for one state and period.
+        """
+
+        row, slot = state_row(state), period_slot(period)
+
+        return (
+            float(self.values[row, slot]),
+            self.versions[self.version_codes[row, slot]],
+            bool(self.regional[row, slot]),
+        )
+
+    def lookup_many(self, states, periods):
+        """
+        (values, version codes) arrays for equal-length state and period
+        sequences, given as text or as intern_states / intern_periods
+        integer arrays; versions[code] gives a version string.
+        """
+
+        rows, slots = intern_states(states), intern_periods(periods)
+
+        return self.values[rows, slots], self.version_codes[rows, slots]
+
+
+# Year (None for the current one) -> GridFactorTable
+_tables = {}
+
+
+def grid_factor_table(year=None):
+    """
+    The GridFactorTable of a year (the current one by default), built on
+    first use and again after the factors change.
+    """
+
+    # The national lookup also lets the server's registry notice edits
+    national = tuple(get_factor("electricity", "IN"))
+
+    table = _tables.get(year)
+
+    if table is None or table.generation != factor_generation() or table.national != national:
+        if year not in _tables and len(_tables) >= GRID_TABLE_CACHE_YEARS:
+            del _tables[next(iter(_tables))]
+
+        generation = factor_generation()
+        table = _tables[year] = GridFactorTable(national, get_grid_factor_rows(year), generation)
+
+    return table
+
+
+def grid_factor(state, period):
+    """
+    (value, version, regional) for a state and billing period.
+    """
+
+    return grid_factor_table(period_year(period)).lookup(state, period)
+
+
+def grid_factors_many(states, periods):
+    """
+    (values, version codes, versions) for equal-length state and period
+    sequences, each period looked up in its year's table;
+    versions[code] gives a version string.
+    """
+
+    rows, slots, years = intern_states(states), intern_periods(periods), intern_years(periods)
+
+    values = np.empty(len(rows))
+    version_codes = np.empty(len(rows), dtype=np.int64)
+    versions = []
+
+    for year in np.unique(years).tolist():
+        table = grid_factor_table(year or None)
+        selected = np.flatnonzero(years == year)
+
+        values[selected] = table.values[rows[selected], slots[selected]]
+        version_codes[selected] = table.version_codes[rows[selected], slots[selected]] + len(versions)
+        versions.extend(table.versions)
+
+    return values, version_codes, versions
@@ -0,0 +1,218 @@
+"""
+Incremental kWh anomaly detection per meter.
+
+Each meter keeps a small rolling state: an EWMA level, a baseline per
+calendar month (for seasonal loads) and an EWMA of the squared forecast
+error. A new bill is scored against the expected kWh for its month as a
+z-score and folded into the state in O(1), so history is never re-read.
+
+States serialize to plain dicts (KwhSeriesState.to_dict / from_dict) and
+JsonStateStore persists them between runs. aggregate_discom_trust accepts a
+state in place of a detect_kwh_anomalies result.
+"""
+
+import json
+import math
+import os
+from datetime import datetime
+
+# Smoothing for the level and error variance, and for month baselines
+LEVEL_ALPHA = 0.3
+SEASONAL_ALPHA = 0.5
+
+# Bills folded in before z-scores are reported
+MIN_HISTORY = 3
+
+# Floor on the error scale, relative to the expected kWh, so a perfectly
+# flat history does not turn a small change into a huge z-score
+MIN_RELATIVE_STD = 0.05
+
+SUSPICIOUS_Z = 2.0
+ANOMALOUS_Z = 3.0
+
+# Recent assessments kept for the trust verdict
+RECENT_WINDOW = 12
+
+
+def _month(period_start):
+    if isinstance(period_start, str):
+        period_start = datetime.fromisoformat(period_start)
+    return period_start.month
+
+
+def severity_for_z(z_score):
+    if z_score is None or abs(z_score) <= SUSPICIOUS_Z:
+        return "normal"
+    if abs(z_score) <= ANOMALOUS_Z:
+        return "suspicious"
+    return "anomalous"
+
+
+class KwhSeriesState:
+    """
+    Rolling kWh statistics for one meter.
+    """
+
+    __slots__ = ("count", "level", "error_var", "seasonal", "recent")
+
+    def __init__(self, count=0, level=None, error_var=0.0, seasonal=None, recent=None):
+        self.count = count
+        self.level = level
+        self.error_var = error_var
+        # Month number -> baseline kWh for bills starting in that month
+        self.seasonal = seasonal or {}
+        # Last RECENT_WINDOW assessments, oldest first
+        self.recent = recent or []
+
+    def expected_kwh(self, month):
+        return self.seasonal.get(month, self.level)
+
+    def update(self, kwh, period_start, invoice_id=None):
+        """
+        Scores one bill against the state and folds it in.
+        Returns the assessment (z_score is None while warming up).
+        """
+
+        month = _month(period_start)
+
+        z_score = None
+        expected = None
+
+        if self.count:
+            expected = self.expected_kwh(month)
+            error = kwh - expected
+
+            if self.count >= MIN_HISTORY:
+                scale = max(math.sqrt(self.error_var), MIN_RELATIVE_STD * abs(expected))
+                z_score = error / scale if scale else 0.0
+
+            self.error_var = (1 - LEVEL_ALPHA) * self.error_var + LEVEL_ALPHA * error * error
+            self.level += LEVEL_ALPHA * (kwh - self.level)
+        else:
+            self.level = float(kwh)
+
+        baseline = self.seasonal.get(month)
+        self.seasonal[month] = kwh if baseline is None else baseline + SEASONAL_ALPHA * (kwh - baseline)
+
+        self.count += 1
+
+        assessment = {
+            "invoice_id": invoice_id,
+            "kwh": kwh,
+            "expected_kwh": None if expected is None else round(expected, 2),
+            "z_score": None if z_score is None else round(z_score, 2),
+            "severity": severity_for_z(z_score),
+        }
+
+        self.recent.append(assessment)
+        del self.recent[:-RECENT_WINDOW]
+
+        return assessment
+
+    def trend_result(self):
+        """
+        The recent window in detect_kwh_anomalies' result format.
+        """
+
+        if self.count < MIN_HISTORY:
+            return {
+                "status": "insufficient_data",
+                "explanation": "At least 3 months of data required for trend analysis"
+            }
+
+        anomalies = [
+            {
+                "invoice_id": assessment["invoice_id"],
+                "z_score": assessment["z_score"],
+                "expected_kwh": assessment["expected_kwh"],
+                "severity": assessment["severity"]
+            }
+            for assessment in self.recent
+            if assessment["severity"] != "normal"
+        ]
+
+        if anomalies:
+            return {"status": "anomalies_detected", "anomalies": anomalies}
+
+        return {
+            "status": "stable",
+            "explanation": "No abnormal kWh deviations from the meter's rolling baseline"
+        }
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "level": self.level,
+            "error_var": self.error_var,
+            # JSON object keys are strings
+            "seasonal": {str(month): value for month, value in self.seasonal.items()},
+            "recent": self.recent,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            count=data["count"],
+            level=data["level"],
+            error_var=data["error_var"],
+            seasonal={int(month): value for month, value in data["seasonal"].items()},
+            recent=data["recent"],
+        )
+
+
+def meter_key(meter_number):
+    """
+    Key of a meter's state. JSON object keys are always strings, so states
+    are keyed by str(meter_number) and survive a save / load unchanged.
+    """
+
+    return str(meter_number)
+
+
+class JsonStateStore:
+    """
+    Persists {meter_key: KwhSeriesState} as one JSON file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return {}
+
+        with open(self.path, encoding="utf-8") as handle:
+            return {meter: KwhSeriesState.from_dict(data) for meter, data in json.load(handle).items()}
+
+    def save(self, states):
+        # Write then rename, so a crash never leaves a half-written file
+        tmp_path = f"{self.path}.tmp"
+
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump({meter_key(meter): state.to_dict() for meter, state in states.items()}, handle)
+
+        os.replace(tmp_path, self.path)
+
+
+def update_kwh_states(states, bills):
+    """
+    Folds bills (dicts with meter_number, billing_period_start, kwh_billed,
+    invoice_id; in billing order per meter) into states, keyed by
+    meter_key, creating states for new meters. Returns the assessments in
+    input order.
+    """
+
+    assessments = []
+
+    for bill in bills:
+        key = meter_key(bill["meter_number"])
+        state = states.get(key)
+
+        if state is None:
+            state = states[key] = KwhSeriesState()
+
+        assessments.append(
+            state.update(bill["kwh_billed"], bill["billing_period_start"], bill.get("invoice_id"))
+        )
+
+    return assessments
@@ -0,0 +1,215 @@
+"""
+Column-wise electricity scoring for many sites at once.
+
+Records ({kwh, state, period, auditor_emission_kg}) are split into columns,
+validated one column at a time with the same rules and messages as
+validate_electricity_input, and scored in one NumPy pass: base emission,
+AI range, auditor deviation and risk score. A record that fails validation
+gets an error instead of stopping the batch, as in run_electricity_ai_batch.
+
+The numbers match run_electricity_ai for every valid record.
+"""
+
+import math
+
+import numpy as np
+
+from ai_engine.electricity.engine import (
+    AI_RANGE_TOLERANCE,
+    MAX_RISK_SCORE,
+    RISK_SCORE_BANDS,
+    is_real_number,
+    plain_number,
+)
+from ai_engine.electricity.grid_factors import grid_factors_many
+
+_MISSING = object()
+
+
+def _round2(values):
+    """
+    round(value, 2) for every value. np.round scales by 100 first, which
+    can move a value sitting on a .xx5 tie to the other side; those few are
+    redone with Python's correctly rounded round().
+    """
+
+    rounded = np.round(values, 2)
+
+    scaled = values * 100
+    ties = np.abs(scaled - np.floor(scaled) - 0.5) <= 1e-6 + np.abs(scaled) * 1e-12
+
+    for i in np.flatnonzero(ties).tolist():
+        rounded[i] = round(float(values[i]), 2)
+
+    return rounded
+
+
+def _finite(value):
+    # Python ints can be too large for a float
+    try:
+        return math.isfinite(value)
+    except OverflowError:
+        return False
+
+
+def validate_electricity_columns(records):
+    """
+    Returns (columns, errors): {field: list} and one error message (or
+    None) per record. The first failing check wins, in the order
+    validate_electricity_input applies them.
+    """
+
+    count = len(records)
+    errors = [None] * count
+
+    def flag(failed, message):
+        # failed: one bool per record; only the failing records are visited
+        for i in np.flatnonzero(np.fromiter(failed, dtype=bool, count=count)).tolist():
+            if errors[i] is None:
+                errors[i] = message
+
+    flag((not isinstance(record, dict) for record in records), "Record must be a JSON object")
+
+    columns = {
+        field: [record.get(field, _MISSING) if isinstance(record, dict) else _MISSING for record in records]
+        for field in ("kwh", "state", "period", "auditor_emission_kg")
+    }
+
+    for field in ("kwh", "state", "period"):
+        flag((value is _MISSING for value in columns[field]), f"Missing required field: {field}")
+
+    kwh_numeric = [isinstance(value, (int, float)) for value in columns["kwh"]]
+    flag((not ok for ok in kwh_numeric), "kwh must be a number")
+
+    kwh_numeric = [ok and _finite(value) for value, ok in zip(columns["kwh"], kwh_numeric)]
+    flag((not ok for ok in kwh_numeric), "kwh must be a finite number")
+
+    kwh = np.array([value if ok else 1 for value, ok in zip(columns["kwh"], kwh_numeric)], dtype=np.float64)
+    flag(kwh <= 0, "kwh must be greater than zero")
+
+    for field in ("state", "period"):
+        flag((not (isinstance(value, str) and value.strip()) for value in columns[field]), f"{field} must be a non-empty string")
+
+    flag((not is_real_number(value) for value in columns["auditor_emission_kg"]), "auditor_emission_kg must be a number")
+    flag((is_real_number(value) and not _finite(value) for value in columns["auditor_emission_kg"]), "auditor_emission_kg must be a finite number")
+
+    return columns, errors
+
+
+def score_electricity_batch(records, emission_factor=None):
+    """
+    Scores a list of records in one vectorized pass. Each record's grid
+    factor comes from its year's state/month table unless emission_factor
+    ((value, version)) is given for all of them.
+
+    Returns {"columns", "errors", "emission_factor", "factor_version_codes",
+    "factor_versions", "calculated_emission_kg", "lower", "upper",
+    "deviation_percent", "risk_score", "within_range"}; the arrays hold one
+    entry per record and are meaningless where errors[i] is set.
+    """
+
+    columns, errors = validate_electricity_columns(records)
+
+    if emission_factor is None:
+        factor, version_codes, versions = grid_factors_many(columns["state"], columns["period"])
+    else:
+        factor = np.full(len(records), float(emission_factor[0]))
+        version_codes = np.zeros(len(records), dtype=np.int64)
+        versions = [emission_factor[1]]
+
+    valid = np.array([error is None for error in errors], dtype=bool)
+
+    def numbers(field):
+        return np.array([value if ok else 0 for value, ok in zip(columns[field], valid.tolist())], dtype=np.float64)
+
+    kwh = numbers("kwh")
+    auditor = numbers("auditor_emission_kg")
+
+    # Overflows and zero bases are reported per record below
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        base = _round2(kwh * factor)
+        lower = _round2(base * (1 - AI_RANGE_TOLERANCE))
+        upper = _round2(base * (1 + AI_RANGE_TOLERANCE))
+        deviation = _round2((auditor - base) / base * 100)
+
+    # A base that rounds to zero cannot give a deviation, as in the engine
+    zero_base = valid & (base == 0)
+
+    for i in np.flatnonzero(zero_base).tolist():
+        errors[i] = "float division by zero"
+
+    # Values near the float limit overflow; Infinity / NaN are not valid JSON
+    finite = np.isfinite(lower) & np.isfinite(upper) & np.isfinite(deviation)
+
+    for i in np.flatnonzero(valid & ~finite).tolist():
+        if errors[i] is None:
+            errors[i] = "Emission values out of range"
+
+    absolute = np.abs(deviation)
+
+    risk_score = np.select(
+        [absolute <= max_deviation for max_deviation, _ in RISK_SCORE_BANDS],
+        [band_score for _, band_score in RISK_SCORE_BANDS],
+        MAX_RISK_SCORE
+    )
+
+    return {
+        "columns": columns,
+        "errors": errors,
+        "emission_factor": factor,
+        "factor_version_codes": version_codes,
+        "factor_versions": versions,
+        "calculated_emission_kg": base,
+        "lower": lower,
+        "upper": upper,
+        "deviation_percent": deviation,
+        "risk_score": risk_score,
+        "within_range": (lower <= auditor) & (auditor <= upper),
+    }
+
+
+def iter_score_rows(scores):
+    """
+    One result dict per record, in input order.
+    """
+
+    columns = scores["columns"]
+    versions = scores["factor_versions"]
+
+    values = zip(
+        scores["errors"],
+        columns["kwh"],
+        columns["state"],
+        columns["period"],
+        columns["auditor_emission_kg"],
+        scores["emission_factor"].tolist(),
+        scores["factor_version_codes"].tolist(),
+        scores["calculated_emission_kg"].tolist(),
+        scores["lower"].tolist(),
+        scores["upper"].tolist(),
+        scores["deviation_percent"].tolist(),
+        scores["risk_score"].tolist(),
+        scores["within_range"].tolist(),
+    )
+
+    for index, (error, kwh, state, period, auditor, factor, version, base, lower, upper, deviation, risk_score, within) in enumerate(values):
+
+        if error is not None:
+            yield {"index": index, "error": error}
+            continue
+
+        yield {
+            "index": index,
+            "kwh": kwh,
+            "state": state,
+            "period": period,
+            "calculated_emission_kg": base,
+            "emission_factor_used": factor,
+            "ai_emission_range": {"lower": lower, "upper": upper},
+            "auditor_emission_kg": plain_number(auditor),
+            "status": "within_ai_range" if within else "outside_ai_range",
+            "deviation_percent": deviation,
+            "risk_score": risk_score,
+            "risk_level": "low" if within else "high",
+            "emission_factor_version": versions[version],
+        }
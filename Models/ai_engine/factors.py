@@ -0,0 +1,91 @@
+"""
+Emission factor lookups shared by the AI engines.
+
+Inside the Django server the core app installs a provider backed by the
+versioned EmissionFactor table (core.services.emission_factors). Standalone
+runs fall back to BUILTIN_FACTORS, which match that table's seed.
+
+State and monthly grid factors (electricity.grid_factors) come from a
+second provider, asked for one year at a time; none are built in, so
+standalone runs use the national factor everywhere.
+"""
+
+BUILTIN_VERSION = "builtin_v1"
+
+# kg CO2e per unit of activity
+BUILTIN_FACTORS = {
+    "electricity": 0.708,           # per kWh, India grid average
+    "diesel": 2.68,                 # per Litre
+    "petrol": 2.31,                 # per Litre
+    "lpg": 1.51,                    # per Litre
+    "natural_gas": 1.8,             # per m3
+    "biodiesel": 0.4,               # per Litre, B100 lifecycle
+    "flight_economy": 0.15,         # per passenger-km
+    "flight_premium_economy": 0.23,
+    "flight_business": 0.45,
+    "flight_first": 0.60,
+    "flight_short_haul": 0.25,
+    "train_electric": 0.04,
+    "video_conference": 0.0,
+    "car": 0.21,                    # per km
+    "waste": 0.5,                   # per kg
+    "waste_recycled": -0.3,         # per kg, avoided
+}
+
+_provider = None
+_grid_provider = None
+
+# Bumped whenever factors may have changed, so tables derived from them rebuild
+_generation = 0
+
+
+def set_factor_provider(provider):
+    """
+    provider(activity, region) -> (value, version). None restores the built-ins.
+    """
+
+    global _provider
+    _provider = provider
+    invalidate_factors()
+
+
+def set_grid_factor_provider(provider):
+    """
+    provider(year) -> iterable of (state code, month 1-12, value, version)
+    electricity factors valid in that year (None: the current year); state
+    "IN" gives the national factor. None removes all state factors.
+    """
+
+    global _grid_provider
+    _grid_provider = provider
+    invalidate_factors()
+
+
+def invalidate_factors():
+    global _generation
+    _generation += 1
+
+
+def factor_generation():
+    return _generation
+
+
+def get_grid_factor_rows(year=None):
+    if _grid_provider is None:
+        return []
+
+    return list(_grid_provider(year))
+
+
+def get_factor(activity, region="GLOBAL"):
+    """
+    Returns (value, version) for an activity.
+    """
+
+    if _provider is not None:
+        return _provider(activity, region)
+
+    if activity not in BUILTIN_FACTORS:
+        raise ValueError(f"Unknown emission factor: {activity}")
+
+    return BUILTIN_FACTORS[activity], BUILTIN_VERSION
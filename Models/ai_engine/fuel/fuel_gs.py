@@ -1,3 +1,59 @@
+import numpy as np
+
+from ai_engine.columns import as_list, factorize
+from ai_engine.factors import get_factor
+
+# process_fuel_evidence's tolerance for tank level differences
+FUEL_MISMATCH_TOLERANCE = 0.05
+
+INVOICE_COLUMNS = ("invoice_id", "asset_id", "period", "fuel_type", "liters_bought")
+LOG_COLUMNS = ("asset_id", "period", "fuel_consumed_log")
+
+
+class FuelBatchResult:
+    """
+    Columnar result of FuelEmissionModel.process_fuel_batch, one row per
+    (asset_id, period). Every column is a NumPy array of the same length.
+
+    status:            VERIFIED, FLAG (bought vs logged mismatch),
+                       NO_LOG or NO_INVOICE
+    efficiency_status: normal, low, zero_fuel or not_checked (no output
+                       reported, or no log)
+    Missing numbers (no log, no output) are NaN.
+    """
+
+    __slots__ = (
+        "asset_id", "period", "fuel_type", "invoice_count", "liters_bought",
+        "liters_logged", "mismatch_liters", "status", "co2_kg", "efficiency",
+        "efficiency_status", "emission_factor_version"
+    )
+
+    COLUMNS = __slots__[:-1]
+
+    def __len__(self):
+        return len(self.status)
+
+    def to_dict(self):
+        """
+        {column: list}, e.g. for JSON.
+        """
+        columns = {column: getattr(self, column).tolist() for column in self.COLUMNS}
+        columns["emission_factor_version"] = self.emission_factor_version
+        return columns
+
+    def rows(self):
+        """
+        One dict per (asset_id, period), NaN as None.
+        """
+        columns = {
+            column: [None if value != value else value for value in getattr(self, column).tolist()]
+            for column in self.COLUMNS
+        }
+
+        for i in range(len(self)):
+            yield {column: values[i] for column, values in columns.items()}
+
+
 class FuelEmissionModel:
     """
     Fuel Consumption & Generator Efficiency Engine.
@@ -6,12 +62,12 @@ class FuelEmissionModel:
     
     def __init__(self):
         # Phase 2: Emission Factor Database (kg CO2e per unit) 
-        # Standard factors (e.g., DEFRA/IPCC)
-        self.fuel_factors = {
-            "Diesel": 2.68,   # kg CO2 per Litre
-            "Petrol": 2.31,   # kg CO2 per Litre
-            "LPG": 1.51,      # kg CO2 per Litre
-            "NaturalGas": 1.8 # kg CO2 per m3
+        # Fuel type -> activity in the emission factor registry
+        self.fuel_activities = {
+            "Diesel": "diesel",          # kg CO2 per Litre
+            "Petrol": "petrol",          # kg CO2 per Litre
+            "LPG": "lpg",                # kg CO2 per Litre
+            "NaturalGas": "natural_gas"  # kg CO2 per m3
         }
         
         # Benchmarks for Anomaly Detection (Phase 1 AI checks) 
@@ -21,6 +77,15 @@ class FuelEmissionModel:
             "Fleet_Truck_Heavy": (2.5, 4.0)            # km per Litre
         }
 
+    def fuel_factor(self, fuel_type):
+        """
+        (kg CO2e per unit, factor version); unknown fuels count as zero.
+        """
+        activity = self.fuel_activities.get(fuel_type)
+        if activity is None:
+            return 0, None
+        return get_factor(activity)
+
     def process_fuel_evidence(self, invoice_data, usage_log):
         """
         Phase 1 & 3: Cross-verifies Invoice (Financial) vs Usage Log (Operational).
@@ -43,14 +108,15 @@ class FuelEmissionModel:
             }
             
         # 3. Calculate Scope 1 Emissions (Phase 2 Ground Truth) 
-        factor = self.fuel_factors.get(fuel_type, 0)
+        factor, factor_version = self.fuel_factor(fuel_type)
         total_emissions = qty_bought * factor
         
         return {
             "status": "VERIFIED",
             "fuel_type": fuel_type,
             "total_liters": qty_bought,
-            "ai_calculated_co2_kg": round(total_emissions, 2)
+            "ai_calculated_co2_kg": round(total_emissions, 2),
+            "emission_factor_version": factor_version
         }
 
     def analyze_efficiency(self, usage_data):
@@ -77,6 +143,110 @@ class FuelEmissionModel:
             
         return {"status": "Normal Operation", "efficiency": round(actual_efficiency, 2)}
 
+    def process_fuel_batch(self, invoices, usage_logs):
+        """
+        process_fuel_evidence and analyze_efficiency for many assets at once,
+        e.g. a year of fuel cards for a fleet.
+
+        invoices:   columns invoice_id, asset_id, period, fuel_type, liters_bought
+        usage_logs: columns asset_id, period, fuel_consumed_log, and optionally
+                    output_value and asset_type for the efficiency check
+        Columns are lists or NumPy arrays (a dict of them, or any mapping
+        such as a pyarrow Table). period is any key, e.g. "2025-04".
+
+        Invoices and logs are joined on (asset_id, period); several invoices
+        (fill-ups) or logs in one period are summed. Returns a FuelBatchResult.
+        """
+        for columns, required, label in ((invoices, INVOICE_COLUMNS, "invoice"), (usage_logs, LOG_COLUMNS, "usage log")):
+            for column in required:
+                if column not in columns:
+                    raise ValueError(f"Missing fuel {label} field: {column}")
+
+        invoice_liters = np.asarray(invoices["liters_bought"], dtype=np.float64)
+        log_liters = np.asarray(usage_logs["fuel_consumed_log"], dtype=np.float64)
+
+        n_invoices = len(invoice_liters)
+
+        # Join key: (asset, period) codes over invoices and logs together
+        asset_codes, assets = factorize(as_list(invoices["asset_id"]) + as_list(usage_logs["asset_id"]))
+        period_codes, periods = factorize(as_list(invoices["period"]) + as_list(usage_logs["period"]))
+
+        keys, group = np.unique(asset_codes * len(periods) + period_codes, return_inverse=True)
+        groups = len(keys)
+
+        invoice_group = group[:n_invoices]
+        log_group = group[n_invoices:]
+
+        # One factor lookup per distinct fuel type; unknown fuels count as zero
+        fuel_codes, fuel_types = factorize(invoices["fuel_type"])
+        lookups = [self.fuel_factor(fuel_type) for fuel_type in fuel_types]
+        factors = np.array([factor for factor, _ in lookups], dtype=np.float64)
+
+        invoice_count = np.bincount(invoice_group, minlength=groups)
+        log_count = np.bincount(log_group, minlength=groups)
+
+        bought = np.bincount(invoice_group, weights=invoice_liters, minlength=groups)
+        logged = np.bincount(log_group, weights=log_liters, minlength=groups)
+        co2 = np.bincount(invoice_group, weights=invoice_liters * factors[fuel_codes], minlength=groups)
+
+        has_invoice = invoice_count > 0
+        has_log = log_count > 0
+
+        mismatch = has_invoice & has_log & (np.abs(bought - logged) > bought * FUEL_MISMATCH_TOLERANCE)
+
+        status = np.full(groups, "VERIFIED", dtype="U10")
+        status[mismatch] = "FLAG"
+        status[~has_log] = "NO_LOG"
+        status[~has_invoice] = "NO_INVOICE"
+
+        # A period's fuel type, or Mixed when its invoices disagree
+        lowest = np.full(groups, len(fuel_types), dtype=np.int64)
+        highest = np.full(groups, -1, dtype=np.int64)
+        np.minimum.at(lowest, invoice_group, fuel_codes)
+        np.maximum.at(highest, invoice_group, fuel_codes)
+
+        fuel_type = np.array(fuel_types + ["Mixed", None], dtype=object)[
+            np.where(~has_invoice, len(fuel_types) + 1, np.where(lowest == highest, lowest, len(fuel_types)))
+        ]
+
+        # Efficiency: output per logged unit of fuel, against the asset benchmark
+        efficiency = np.full(groups, np.nan)
+        efficiency_status = np.full(groups, "not_checked", dtype="U11")
+
+        if "output_value" in usage_logs:
+            output = np.bincount(log_group, weights=np.asarray(usage_logs["output_value"], dtype=np.float64), minlength=groups)
+
+            minimum = np.zeros(groups)
+
+            if "asset_type" in usage_logs:
+                type_codes, asset_types = factorize(usage_logs["asset_type"])
+                type_minimum = np.array([self.efficiency_benchmarks.get(asset_type, (0, 0))[0] for asset_type in asset_types], dtype=np.float64)
+                minimum[log_group] = type_minimum[type_codes]
+
+            fueled = has_log & (logged != 0)
+
+            efficiency[fueled] = output[fueled] / logged[fueled]
+
+            efficiency_status[fueled] = np.where(efficiency[fueled] < minimum[fueled], "low", "normal")
+            efficiency_status[has_log & ~fueled] = "zero_fuel"
+
+        result = FuelBatchResult()
+
+        result.asset_id = np.array(assets, dtype=object)[keys // len(periods)]
+        result.period = np.array(periods, dtype=object)[keys % len(periods)]
+        result.fuel_type = fuel_type
+        result.invoice_count = invoice_count
+        result.liters_bought = bought
+        result.liters_logged = np.where(has_log, logged, np.nan)
+        result.mismatch_liters = np.where(has_log, bought - logged, np.nan)
+        result.status = status
+        result.co2_kg = co2
+        result.efficiency = efficiency
+        result.efficiency_status = efficiency_status
+        result.emission_factor_version = ",".join(sorted({version for _, version in lookups if version}))
+
+        return result
+
     def calculate_reduction_credit(self, scenario):
         """
         🟢 REDUCTION MODEL (Credit Generation)
@@ -89,7 +259,8 @@ class FuelEmissionModel:
         # 1. Baseline Emissions (The "Dirty" Scenario)
         # Assume standard generator efficiency of 3.3 kWh/L for Diesel
         baseline_liters_needed = energy_amount / 3.3
-        baseline_emissions = baseline_liters_needed * self.fuel_factors['Diesel']
+        diesel_factor, factor_version = self.fuel_factor("Diesel")
+        baseline_emissions = baseline_liters_needed * diesel_factor
         
         # 2. Project Emissions (The "Clean" Scenario)
         if new_source == "Solar_Hybrid":
@@ -97,7 +268,7 @@ class FuelEmissionModel:
         elif new_source == "Biodiesel":
             # Biodiesel (B100) often rated ~0.4 kg CO2/L (lifecycle) vs 2.68 for Diesel
             project_liters_needed = energy_amount / 3.0 # Slightly lower efficiency
-            project_emissions = project_liters_needed * 0.4 
+            project_emissions = project_liters_needed * get_factor("biodiesel")[0]
         else:
             project_emissions = baseline_emissions # No change
             
@@ -108,36 +279,38 @@ class FuelEmissionModel:
             "scenario": f"Switch {baseline_fuel} -> {new_source}",
             "baseline_co2_kg": round(baseline_emissions, 2),
             "project_co2_kg": round(project_emissions, 2),
-            "credits_generated": round(avoided_co2, 2)
+            "credits_generated": round(avoided_co2, 2),
+            "emission_factor_version": factor_version
         }
 
-# --- USAGE SIMULATION ---
-fuel_ai = FuelEmissionModel()
-
-# 1. Processing Invoices & Logs (Audit Check)
-# Data: Invoice says 1000L Diesel purchased. Log says generator ran 20 hours at 50L/hr.
-invoice_input = {"liters_bought": 1000, "fuel_type": "Diesel", "invoice_id": "INV-FUEL-001"}
-log_input = {"fuel_consumed_log": 1000, "hours_run": 20}
-
-audit_result = fuel_ai.process_fuel_evidence(invoice_input, log_input)
-print(f"⛽ Fuel Audit Result: {audit_result}")
-
-# 2. Efficiency Check (Anomaly Detection)
-# Data: Generator produced 3000 kWh using 1000 Liters (Efficiency = 3.0 kWh/L)
-machine_data = {
-    "asset_type": "Diesel_Generator_Industrial",
-    "output_value": 3000, # kWh
-    "fuel_used": 1000     # Liters
-}
-efficiency_check = fuel_ai.analyze_efficiency(machine_data)
-print(f"⚙️  Efficiency Check: {efficiency_check}")
-
-# 3. Reduction Credit (Green Project)
-# Data: Replacing a Diesel Generator (needs 1000 kWh) with Solar
-green_project = {
-    "energy_required": 1000, # kWh
-    "baseline_fuel": "Diesel",
-    "new_source": "Solar_Hybrid"
-}
-credit_result = fuel_ai.calculate_reduction_credit(green_project)
-print(f"🟢 Credit Generation: {credit_result}")
\ No newline at end of file
+if __name__ == "__main__":
+    # --- USAGE SIMULATION ---
+    fuel_ai = FuelEmissionModel()
+
+    # 1. Processing Invoices & Logs (Audit Check)
+    # Data: Invoice says 1000L Diesel purchased. Log says generator ran 20 hours at 50L/hr.
+    invoice_input = {"liters_bought": 1000, "fuel_type": "Diesel", "invoice_id": "INV-FUEL-001"}
+    log_input = {"fuel_consumed_log": 1000, "hours_run": 20}
+
+    audit_result = fuel_ai.process_fuel_evidence(invoice_input, log_input)
+    print(f"⛽ Fuel Audit Result: {audit_result}")
+
+    # 2. Efficiency Check (Anomaly Detection)
+    # Data: Generator produced 3000 kWh using 1000 Liters (Efficiency = 3.0 kWh/L)
+    machine_data = {
+        "asset_type": "Diesel_Generator_Industrial",
+        "output_value": 3000, # kWh
+        "fuel_used": 1000     # Liters
+    }
+    efficiency_check = fuel_ai.analyze_efficiency(machine_data)
+    print(f"⚙️  Efficiency Check: {efficiency_check}")
+
+    # 3. Reduction Credit (Green Project)
+    # Data: Replacing a Diesel Generator (needs 1000 kWh) with Solar
+    green_project = {
+        "energy_required": 1000, # kWh
+        "baseline_fuel": "Diesel",
+        "new_source": "Solar_Hybrid"
+    }
+    credit_result = fuel_ai.calculate_reduction_credit(green_project)
+    print(f"🟢 Credit Generation: {credit_result}")
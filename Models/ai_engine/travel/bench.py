@@ -0,0 +1,75 @@
+"""
+Benchmark for BusinessTravelEmissionModel flight processing.
+
+    python -m ai_engine.travel.bench [legs]
+
+Compares process_flight_invoice per leg (with and without the pair LRU)
+against process_flight_batch, over legs drawn from a few hundred routes,
+then both paths again with legs given as bundled IATA codes.
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from ai_engine.travel import business_travel as model
+
+
+def _timed(label, legs, func):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+
+    print(f"{label:<20} {legs:>9} legs  {legs / elapsed:>14,.0f} legs/s")
+    return elapsed
+
+
+def main(legs=1000000, airports=300, routes=500):
+    rng = np.random.default_rng(0)
+
+    coords = rng.uniform([-60, -180], [70, 180], size=(airports, 2))
+    route_airports = rng.integers(0, airports, size=(routes, 2))
+    leg_routes = rng.integers(0, routes, size=legs)
+
+    origins = coords[route_airports[leg_routes, 0]]
+    dests = coords[route_airports[leg_routes, 1]]
+    classes = np.array(["Economy", "Business", "PremiumEconomy", "First"])[rng.integers(0, 4, size=legs)]
+
+    travel_model = model.BusinessTravelEmissionModel()
+
+    invoices = [
+        {"origin_coords": tuple(o), "dest_coords": tuple(d), "flight_class": c}
+        for o, d, c in zip(origins.tolist(), dests.tolist(), classes.tolist())
+    ]
+
+    cached = model.haversine_km
+
+    model.haversine_km = cached.__wrapped__
+    uncached_time = _timed("per-leg, no cache", legs, lambda: [travel_model.process_flight_invoice(i) for i in invoices])
+
+    model.haversine_km = cached
+    cached.cache_clear()
+    cached_time = _timed("per-leg, pair LRU", legs, lambda: [travel_model.process_flight_invoice(i) for i in invoices])
+
+    batch_time = _timed("batch", legs, lambda: travel_model.process_flight_batch(origins, dests, classes))
+
+    print(f"pair LRU speedup {uncached_time / cached_time:.1f}x, batch speedup {uncached_time / batch_time:.0f}x")
+
+    codes = np.array(model.airport_index().codes)
+    code_routes = codes[rng.integers(0, len(codes), size=(routes, 2))]
+
+    origin_codes = code_routes[leg_routes, 0]
+    dest_codes = code_routes[leg_routes, 1]
+
+    code_invoices = [
+        {"origin_airport": o, "dest_airport": d, "flight_class": c}
+        for o, d, c in zip(origin_codes.tolist(), dest_codes.tolist(), classes.tolist())
+    ]
+
+    _timed("per-leg, IATA codes", legs, lambda: [travel_model.process_flight_invoice(i) for i in code_invoices])
+    _timed("batch, IATA codes", legs, lambda: travel_model.process_flight_batch(origin_codes, dest_codes, classes))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
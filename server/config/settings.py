@@ -10,11 +10,18 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# The ai_engine package (Models/ai_engine) is imported by the core app.
+AI_ENGINE_DIR = BASE_DIR.parent / 'Models'
+
+if str(AI_ENGINE_DIR) not in sys.path:
+    sys.path.append(str(AI_ENGINE_DIR))
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/6.0/howto/deployment/checklist/
@@ -79,10 +86,27 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # File-backed test DB: the ledger concurrency tests need real
+        # cross-connection locking, which shared-cache :memory: lacks.
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
+    }
+}
+
+# Per-user API responses (core.services.response_cache). Use a shared
+# backend such as FileBasedCache or Redis when running several processes.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
     }
 }
 
 
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -133,3 +157,7 @@ from datetime import timedelta
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=1),
 }
+
+# Mint verified reductions as one fungible CreditLot per project instead of
+# one ledger entry per kg.
+CREDIT_LOTS_ENABLED = False
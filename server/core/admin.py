@@ -1,10 +1,15 @@
 from django.contrib import admin
-from .models import CarbonTransaction, HashLedgerEntry, CarbonProject, EmissionReport, ReductionProjectData
+from .models import CarbonTransaction, HashLedgerEntry, LedgerCheckpoint, CreditState, CreditLot, CarbonProject, EmissionReport, ReductionProjectData, BackgroundJob, EmissionFactor
 # Register your models here.
 
 admin.site.register(CarbonTransaction)
 admin.site.register(HashLedgerEntry)
+admin.site.register(LedgerCheckpoint)
+admin.site.register(CreditState)
+admin.site.register(CreditLot)
 admin.site.register(CarbonProject)
 admin.site.register(EmissionReport)
+admin.site.register(EmissionFactor)
 admin.site.register(ReductionProjectData)
+admin.site.register(BackgroundJob)
 
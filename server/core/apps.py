@@ -3,3 +3,8 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from core.services.emission_factors import install_engine_factor_provider
+
+        install_engine_factor_provider()
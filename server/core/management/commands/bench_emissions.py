@@ -0,0 +1,96 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.models import EmissionReport
+from core.services.emissions_batch import RECALCULATE_BATCH_SIZE, recalculate_emissions
+from core.services.emission_factors import report_emission_factors
+from core.services.verification_service import calculate_emissions
+from users.models import User
+
+# Reports per synthetic user: (year, quarter) must be unique per user.
+REPORTS_PER_USER = 400
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks emission recalculation, batched vs one report at a time, "
+        "and reports reports per second. Every run is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="10000,1000000",
+            help="Comma-separated report counts."
+        )
+        parser.add_argument("--batch-size", type=int, default=RECALCULATE_BATCH_SIZE)
+        parser.add_argument(
+            "--skip-per-row",
+            action="store_true",
+            help="Only time the batched path."
+        )
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options["sizes"].split(",")]
+
+        for size in sizes:
+            rate = self._run(size, lambda reports: recalculate_emissions(reports, batch_size=options["batch_size"]))
+            self.stdout.write(f"batched  {size:>9} reports  {rate:>12,.0f} reports/s")
+
+            if not options["skip_per_row"]:
+                rate = self._run(size, self._recalculate_per_row)
+                self.stdout.write(f"per-row  {size:>9} reports  {rate:>12,.0f} reports/s")
+
+    def _recalculate_per_row(self, reports):
+        for report in reports.iterator(chunk_size=2000):
+            factors, version = report_emission_factors(report.year, report.quarter)
+            report.estimated_emissions_kg = calculate_emissions(report, factors)
+            report.emission_factor_version = version
+            report.save(update_fields=["estimated_emissions_kg", "emission_factor_version"])
+
+    def _run(self, size, recalculate):
+        with transaction.atomic():
+            tag = uuid.uuid4().hex[:12]
+            user_count = -(-size // REPORTS_PER_USER)
+
+            users = User.objects.bulk_create([
+                User(
+                    email=f"bench-{tag}-{i}@example.com",
+                    username=f"bench-{tag}-{i}",
+                    organization_name=f"Bench {tag} {i}",
+                    website=f"https://{tag}-{i}.example.com",
+                    country="IN",
+                )
+                for i in range(user_count)
+            ])
+
+            reports = [
+                EmissionReport(
+                    user=users[i // REPORTS_PER_USER],
+                    year=1900 + (i % REPORTS_PER_USER) // 4,
+                    quarter=f"Q{i % 4 + 1}",
+                    electricity_kwh=1000 + i % 997,
+                    diesel_liters=i % 50,
+                    petrol_liters=i % 30,
+                    natural_gas_m3=i % 20,
+                    flight_km=i % 3000,
+                    car_km=i % 800,
+                    waste_kg=i % 400,
+                    recycled_waste_kg=i % 300,
+                )
+                for i in range(size)
+            ]
+            EmissionReport.objects.bulk_create(reports, batch_size=5000)
+
+            queryset = EmissionReport.objects.filter(user__in=users)
+
+            start = time.perf_counter()
+            recalculate(queryset)
+            elapsed = time.perf_counter() - start
+
+            transaction.set_rollback(True)
+
+        return size / elapsed
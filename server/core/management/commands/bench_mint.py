@@ -0,0 +1,84 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.models import CarbonProject
+from core.services.verification_service import (
+    MINT_BATCH_SIZE,
+    create_ledger_entry,
+    mint_credits_for_project,
+)
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks credit minting and reports mints per second. "
+        "Every run is rolled back, so the ledger is left untouched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="1000,100000,1000000",
+            help="Comma-separated credit counts to mint."
+        )
+        parser.add_argument("--batch-size", type=int, default=MINT_BATCH_SIZE)
+        parser.add_argument(
+            "--sequential",
+            action="store_true",
+            help="Also time the one-create_ledger_entry-per-credit path."
+        )
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options["sizes"].split(",")]
+
+        for size in sizes:
+            rate = self._run(size, lambda project: mint_credits_for_project(project.id, options["batch_size"]))
+            self.stdout.write(f"batched     {size:>9} credits  {rate:>12,.0f} mints/s")
+
+            if options["sequential"]:
+                rate = self._run(size, self._mint_sequential)
+                self.stdout.write(f"sequential  {size:>9} credits  {rate:>12,.0f} mints/s")
+
+    def _mint_sequential(self, project):
+        for _ in range(int(project.estimated_reduction_kg)):
+            create_ledger_entry(
+                event_type="MINT",
+                credit_id=str(uuid.uuid4()),
+                from_entity=str(project.user_id),
+                to_entity="MARKET",
+                metadata={"project_id": project.id}
+            )
+
+    def _run(self, size, mint):
+        with transaction.atomic():
+            tag = uuid.uuid4().hex[:12]
+            user = User.objects.create(
+                email=f"bench-{tag}@example.com",
+                username=f"bench-{tag}",
+                organization_name=f"Bench {tag}",
+                website=f"https://{tag}.example.com",
+                country="IN",
+            )
+            project = CarbonProject.objects.create(
+                user=user,
+                submission_type="reduction",
+                methodology="solar_reduction",
+                title="Mint benchmark",
+                description="Synthetic project for bench_mint",
+                year=2025,
+                quarter="Q1",
+                ai_status="approved",
+                estimated_reduction_kg=size,
+            )
+
+            start = time.perf_counter()
+            mint(project)
+            elapsed = time.perf_counter() - start
+
+            transaction.set_rollback(True)
+
+        return size / elapsed
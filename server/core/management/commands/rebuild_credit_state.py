@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from core.services.credit_lots import rebuild_credit_lots
+from core.services.verification_service import rebuild_credit_state
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the CreditState and CreditLot projections by replaying the hash ledger."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Ledger rows fetched / state rows written per batch."
+        )
+
+    def handle(self, *args, **options):
+        count = rebuild_credit_state(chunk_size=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt state for {count} credits"))
+
+        lots = rebuild_credit_lots(chunk_size=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {lots} credit lots"))
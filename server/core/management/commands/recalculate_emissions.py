@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from core.services.emissions_batch import RECALCULATE_BATCH_SIZE, recalculate_emissions
+
+
+class Command(BaseCommand):
+    help = "Recomputes estimated_emissions_kg for every EmissionReport, e.g. after an emission factor changes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=RECALCULATE_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        summary = recalculate_emissions(batch_size=options["batch_size"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Recalculated {summary['reports']} reports, {summary['updated']} changed"
+        ))
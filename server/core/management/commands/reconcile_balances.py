@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.services.balance_service import reconcile_balances
+
+
+class Command(BaseCommand):
+    help = "Compares cached User.carbon_balance values with the credits each user holds on the ledger."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Reset mismatched balances to the ledger value and post an adjust transaction."
+        )
+
+    def handle(self, *args, **options):
+        mismatches = reconcile_balances(fix=options["fix"])
+
+        for mismatch in mismatches:
+            self.stdout.write(
+                f"user {mismatch['user_id']}: cached {mismatch['cached']} != ledger {mismatch['ledger']}"
+            )
+
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS("All balances match the ledger"))
+        elif options["fix"]:
+            self.stdout.write(self.style.SUCCESS(f"Fixed {len(mismatches)} balances"))
+        else:
+            raise CommandError(f"{len(mismatches)} balances differ from the ledger")
@@ -0,0 +1,45 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from core.services.jobs import claim_next_job, requeue_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = "Runs queued BackgroundJobs (verification / minting). No external broker needed."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit when the queue is empty instead of polling."
+        )
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between polls when idle.")
+        parser.add_argument(
+            "--stale-after",
+            type=int,
+            default=600,
+            help="Requeue running jobs with no progress report for this many seconds."
+        )
+
+    def handle(self, *args, **options):
+        stale_after = timedelta(seconds=options["stale_after"])
+
+        while True:
+            requeue_stale_jobs(stale_after)
+
+            job = claim_next_job()
+
+            if job is None:
+                if options["once"]:
+                    return
+                time.sleep(options["poll_interval"])
+                continue
+
+            self.stdout.write(f"Running {job}")
+
+            if run_job(job):
+                self.stdout.write(self.style.SUCCESS(f"Finished {job.kind} #{job.id}"))
+            else:
+                self.stdout.write(self.style.ERROR(f"Failed {job.kind} #{job.id}"))
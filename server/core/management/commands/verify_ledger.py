@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.services.ledger_verification import verify_ledger
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-hashes the ledger and checks every prev_hash link. Only entries "
+        "after the latest signed checkpoint are verified unless --full is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Verify from GENESIS instead of resuming from the latest checkpoint."
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="With --full, verify the segments between checkpoints in this many processes."
+        )
+        parser.add_argument("--chunk-size", type=int, default=2000)
+        parser.add_argument(
+            "--checkpoint-every",
+            type=int,
+            default=100000,
+            help="Write a signed checkpoint every N verified entries."
+        )
+        parser.add_argument(
+            "--no-checkpoint",
+            action="store_true",
+            help="Do not write new checkpoints."
+        )
+
+    def handle(self, *args, **options):
+        summary = verify_ledger(
+            full=options["full"],
+            workers=options["workers"],
+            chunk_size=options["chunk_size"],
+            checkpoint_every=options["checkpoint_every"],
+            write_checkpoints=not options["no_checkpoint"],
+        )
+
+        self.stdout.write(
+            f"Verified {summary['verified']} entries "
+            f"(after #{summary['start_id']} up to #{summary['last_id']}), "
+            f"{summary['checkpoints_written']} checkpoints written"
+        )
+
+        if summary["error_count"]:
+            for error in summary["errors"]:
+                self.stderr.write(f"#{error['entry_id']}: {error['error']}")
+
+            raise CommandError(f"Ledger verification failed with {summary['error_count']} errors")
+
+        self.stdout.write(self.style.SUCCESS("Ledger chain is intact"))
@@ -0,0 +1,68 @@
+# Generated by Django 6.0.2 on 2026-10-18 09:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_credit_state(apps, schema_editor):
+    HashLedgerEntry = apps.get_model("core", "HashLedgerEntry")
+    CreditState = apps.get_model("core", "CreditState")
+    CarbonProject = apps.get_model("core", "CarbonProject")
+
+    states = {}
+
+    for entry in HashLedgerEntry.objects.order_by("id").iterator(chunk_size=2000):
+        if entry.event_type == "RETIRE":
+            owner, status = entry.from_entity, "retired"
+        elif entry.to_entity == "MARKET":
+            owner, status = entry.to_entity, "market"
+        else:
+            owner, status = entry.to_entity, "owned"
+
+        project_id = states[entry.credit_id][2] if entry.credit_id in states else None
+        if entry.event_type == "MINT":
+            project_id = (entry.metadata or {}).get("project_id")
+
+        states[entry.credit_id] = (owner, status, project_id, entry.hash)
+
+    existing_projects = set(CarbonProject.objects.values_list("id", flat=True))
+
+    CreditState.objects.bulk_create(
+        (
+            CreditState(
+                credit_id=credit_id,
+                owner=owner,
+                status=status,
+                project_id=project_id if project_id in existing_projects else None,
+                last_hash=entry_hash,
+            )
+            for credit_id, (owner, status, project_id, entry_hash) in states.items()
+        ),
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_carbonproject_reductionprojectdata_emissionreport'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CreditState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('credit_id', models.UUIDField(unique=True)),
+                ('owner', models.CharField(max_length=255)),
+                ('status', models.CharField(choices=[('market', 'On Market'), ('owned', 'Owned'), ('retired', 'Retired')], max_length=10)),
+                ('last_hash', models.CharField(max_length=64)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('project', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='credit_states', to='core.carbonproject')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'owner'], name='core_credit_status_c76cf3_idx')],
+            },
+        ),
+        migrations.RunPython(populate_credit_state, migrations.RunPython.noop),
+    ]
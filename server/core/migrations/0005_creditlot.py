@@ -0,0 +1,35 @@
+# Generated by Django 6.0.2 on 2026-10-18 09:41
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_creditstate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CreditLot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('lot_id', models.UUIDField(default=uuid.uuid4, unique=True)),
+                ('serial_start', models.PositiveBigIntegerField()),
+                ('serial_end', models.PositiveBigIntegerField()),
+                ('quantity', models.PositiveBigIntegerField()),
+                ('owner', models.CharField(max_length=255)),
+                ('status', models.CharField(choices=[('market', 'On Market'), ('owned', 'Owned'), ('retired', 'Retired')], max_length=10)),
+                ('last_hash', models.CharField(max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('parent', models.ForeignKey(blank=True, help_text='Lot this one was split from.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='splits', to='core.creditlot')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='credit_lots', to='core.carbonproject')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'owner'], name='core_credit_status_277551_idx'), models.Index(fields=['project', 'serial_start'], name='core_credit_project_2203fe_idx')],
+            },
+        ),
+    ]
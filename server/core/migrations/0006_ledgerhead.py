@@ -0,0 +1,38 @@
+# Generated by Django 6.0.2 on 2026-10-18 09:42
+
+from django.db import migrations, models
+
+
+def seed_ledger_head(apps, schema_editor):
+    HashLedgerEntry = apps.get_model("core", "HashLedgerEntry")
+    LedgerHead = apps.get_model("core", "LedgerHead")
+
+    last_entry = HashLedgerEntry.objects.order_by("-id").first()
+
+    LedgerHead.objects.create(
+        pk=1,
+        last_hash=last_entry.hash if last_entry else "GENESIS",
+        last_entry_id=last_entry.id if last_entry else None,
+        length=HashLedgerEntry.objects.count(),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_creditlot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerHead',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_hash', models.CharField(default='GENESIS', max_length=64)),
+                ('last_entry_id', models.BigIntegerField(blank=True, null=True)),
+                ('length', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(seed_ledger_head, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 6.0.2 on 2026-10-18 09:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_ledgercheckpoint'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='creditlot',
+            index=models.Index(fields=['status', 'id'], name='core_credit_status_66ddb4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='creditlot',
+            index=models.Index(fields=['status', 'project', 'id'], name='core_credit_status_be391f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='creditstate',
+            index=models.Index(fields=['status', 'id'], name='core_credit_status_2e8d4a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='creditstate',
+            index=models.Index(fields=['status', 'project', 'id'], name='core_credit_status_6339a0_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.2 on 2026-10-18 09:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_marketplace_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='carbonproject',
+            index=models.Index(fields=['methodology', 'year', 'quarter'], name='core_carbon_methodo_7c6af1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='carbonproject',
+            index=models.Index(fields=['year', 'quarter'], name='core_carbon_year_896e03_idx'),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 6.0.2 on 2026-10-18 09:55
+
+from django.db import migrations, models
+
+
+# The factors previously hard-coded in calculate_emissions and the AI engines.
+# Where they disagreed, the engines' cited values are kept.
+SEED_FACTORS = [
+    # activity, region, unit, value, source
+    ("electricity", "IN", "kWh", 0.708, "CEA India grid average"),
+    ("diesel", "GLOBAL", "L", 2.68, "DEFRA/IPCC"),
+    ("petrol", "GLOBAL", "L", 2.31, "DEFRA/IPCC"),
+    ("lpg", "GLOBAL", "L", 1.51, "DEFRA/IPCC"),
+    ("natural_gas", "GLOBAL", "m3", 1.8, "DEFRA/IPCC"),
+    ("biodiesel", "GLOBAL", "L", 0.4, "B100 lifecycle"),
+    ("flight_economy", "GLOBAL", "pkm", 0.15, "Illustrative"),
+    ("flight_premium_economy", "GLOBAL", "pkm", 0.23, "Illustrative"),
+    ("flight_business", "GLOBAL", "pkm", 0.45, "Illustrative"),
+    ("flight_first", "GLOBAL", "pkm", 0.60, "Illustrative"),
+    ("flight_short_haul", "GLOBAL", "pkm", 0.25, "Illustrative"),
+    ("train_electric", "GLOBAL", "pkm", 0.04, "Illustrative"),
+    ("video_conference", "GLOBAL", "pkm", 0.0, "Illustrative"),
+    ("car", "GLOBAL", "km", 0.21, "CarbonCred default"),
+    ("waste", "GLOBAL", "kg", 0.5, "CarbonCred default"),
+    ("waste_recycled", "GLOBAL", "kg", -0.3, "CarbonCred default"),
+]
+
+
+def seed_emission_factors(apps, schema_editor):
+    EmissionFactor = apps.get_model("core", "EmissionFactor")
+
+    EmissionFactor.objects.bulk_create([
+        EmissionFactor(activity=activity, region=region, unit=unit, value=value, version="v1", source=source)
+        for activity, region, unit, value, source in SEED_FACTORS
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_backgroundjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emissionreport',
+            name='emission_factor_version',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.CreateModel(
+            name='EmissionFactor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('activity', models.CharField(max_length=50)),
+                ('region', models.CharField(default='GLOBAL', max_length=50)),
+                ('unit', models.CharField(max_length=20)),
+                ('value', models.FloatField()),
+                ('valid_from', models.DateField(blank=True, null=True)),
+                ('valid_to', models.DateField(blank=True, null=True)),
+                ('version', models.CharField(max_length=50)),
+                ('source', models.CharField(blank=True, max_length=255)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['activity', 'region', 'valid_from'], name='core_emissi_activit_666081_idx')],
+            },
+        ),
+        migrations.RunPython(seed_emission_factors, migrations.RunPython.noop),
+    ]
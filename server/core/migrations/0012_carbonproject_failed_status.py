@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-18 10:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_emissionfactor'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='carbonproject',
+            name='ai_status',
+            field=models.CharField(choices=[('draft', 'Draft'), ('submitted', 'Submitted'), ('processing', 'Processing'), ('approved', 'Approved'), ('rejected', 'Rejected'), ('failed', 'Verification Failed')], default='draft', max_length=20),
+        ),
+    ]
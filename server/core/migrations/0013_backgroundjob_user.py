@@ -0,0 +1,39 @@
+# Generated by Django 6.0.2 on 2026-10-18 10:48
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def assign_job_users(apps, schema_editor):
+    BackgroundJob = apps.get_model("core", "BackgroundJob")
+    CarbonProject = apps.get_model("core", "CarbonProject")
+
+    # Existing verification jobs belong to their project's owner.
+    for job in BackgroundJob.objects.filter(kind="verify_reduction").iterator():
+        owner_id = (
+            CarbonProject.objects
+            .filter(pk=job.payload.get("project_id"))
+            .values_list("user_id", flat=True)
+            .first()
+        )
+
+        if owner_id is not None:
+            BackgroundJob.objects.filter(pk=job.pk).update(user_id=owner_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_carbonproject_failed_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='backgroundjob',
+            name='user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='jobs', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(assign_job_users, migrations.RunPython.noop),
+    ]
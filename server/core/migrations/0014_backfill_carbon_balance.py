@@ -0,0 +1,55 @@
+# Generated by Django 6.0.2 on 2026-10-18 10:52
+
+from collections import defaultdict
+
+from django.db import migrations
+from django.db.models import Count, Sum
+
+
+def backfill_carbon_balance(apps, schema_editor):
+    """
+    Sets every cached carbon_balance to the user's current holdings, as
+    reconcile_balances --fix does, so balances posted from now on start
+    from the right value.
+    """
+
+    User = apps.get_model("users", "User")
+    CarbonTransaction = apps.get_model("core", "CarbonTransaction")
+    CreditState = apps.get_model("core", "CreditState")
+    CreditLot = apps.get_model("core", "CreditLot")
+
+    holdings = defaultdict(int)
+
+    credits = CreditState.objects.filter(status="owned").values("owner").annotate(total=Count("id"))
+    lots = CreditLot.objects.filter(status="owned").values("owner").annotate(total=Sum("quantity"))
+
+    for row in list(credits) + list(lots):
+        if str(row["owner"]).isdigit():
+            holdings[int(row["owner"])] += row["total"]
+
+    for user_id, cached in User.objects.values_list("id", "carbon_balance").iterator():
+        ledger = holdings.get(user_id, 0)
+
+        if cached == ledger:
+            continue
+
+        CarbonTransaction.objects.create(
+            user_id=user_id,
+            amount=ledger - cached,
+            transaction_type="adjust",
+            description="Backfilled from ledger holdings"
+        )
+
+        User.objects.filter(pk=user_id).update(carbon_balance=ledger)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_backgroundjob_user'),
+        ('users', '0002_user_last_ledger_entry_id'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_carbon_balance, migrations.RunPython.noop),
+    ]
@@ -78,7 +78,6 @@ class HashLedgerEntry(models.Model):
     class Meta:
         ordering = ["id"]
 
-
     def __str__(self):
         return f"{self.event.type} | {self.credit_id} | {self.hash[:10]}"
     
@@ -90,6 +89,136 @@ class HashLedgerEntry(models.Model):
     def delete(self, *args, **kwargs):
         raise Exception("Ledger entries cannot be deleted.")
 
+
+class LedgerHead(models.Model):
+    """
+    Single row tracking the tip of the hash chain. create_ledger_entry locks
+    it to read prev_hash and advances it in the same transaction, so appends
+    are O(1) and concurrent writers cannot fork the chain.
+    """
+
+    last_hash = models.CharField(max_length=64, default="GENESIS")
+    last_entry_id = models.BigIntegerField(null=True, blank=True)
+    length = models.PositiveBigIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.length} entries | {self.last_hash[:10]}"
+
+
+class LedgerCheckpoint(models.Model):
+    """
+    Signed record that the chain up to and including entry_id verified
+    clean. verify_ledger resumes from the latest valid checkpoint.
+    """
+
+    entry_id = models.BigIntegerField(unique=True)
+    hash = models.CharField(max_length=64)
+
+    # HMAC of "entry_id:hash" keyed by SECRET_KEY.
+    signature = models.CharField(max_length=64)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["entry_id"]
+
+    def __str__(self):
+        return f"#{self.entry_id} | {self.hash[:10]}"
+
+
+class CreditState(models.Model):
+    """
+    Current-state projection of the hash ledger: one row per credit.
+    Written by create_ledger_entry in the same transaction as the entry,
+    rebuilt from scratch with `manage.py rebuild_credit_state`.
+    """
+
+    STATUS_CHOICES = (
+        ("market", "On Market"),
+        ("owned", "Owned"),
+        ("retired", "Retired"),
+    )
+
+    credit_id = models.UUIDField(unique=True)
+
+    # Holder of the credit; for retired credits, the user who retired it.
+    owner = models.CharField(max_length=255)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+
+    project = models.ForeignKey(
+        "CarbonProject",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="credit_states"
+    )
+
+    last_hash = models.CharField(max_length=64)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "owner"]),
+            # Marketplace keyset pagination (see services/marketplace.py).
+            models.Index(fields=["status", "id"]),
+            models.Index(fields=["status", "project", "id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.credit_id} | {self.status} | {self.owner}"
+
+
+class CreditLot(models.Model):
+    """
+    Fungible block of a project's credits covering serials
+    serial_start..serial_end (inclusive, 1 serial = 1 kg CO2).
+    Trades and retirements of part of a lot split it by serial range.
+    """
+
+    lot_id = models.UUIDField(default=uuid.uuid4, unique=True)
+
+    project = models.ForeignKey(
+        "CarbonProject",
+        on_delete=models.CASCADE,
+        related_name="credit_lots"
+    )
+
+    serial_start = models.PositiveBigIntegerField()
+    serial_end = models.PositiveBigIntegerField()
+    quantity = models.PositiveBigIntegerField()
+
+    # Same owner / status semantics as CreditState.
+    owner = models.CharField(max_length=255)
+    status = models.CharField(max_length=10, choices=CreditState.STATUS_CHOICES)
+
+    parent = models.ForeignKey(
+        "self",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="splits",
+        help_text="Lot this one was split from."
+    )
+
+    last_hash = models.CharField(max_length=64)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "owner"]),
+            models.Index(fields=["project", "serial_start"]),
+            models.Index(fields=["status", "id"]),
+            models.Index(fields=["status", "project", "id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.project_id} #{self.serial_start}-{self.serial_end} | {self.status} | {self.owner}"
+
+
 class CarbonProject(models.Model):
 
     SUBMISSION_TYPES = (
@@ -112,6 +241,7 @@ class CarbonProject(models.Model):
         ("processing", "Processing"),
         ("approved", "Approved"),
         ("rejected", "Rejected"),
+        ("failed", "Verification Failed"),
     )
 
     user = models.ForeignKey(
@@ -136,6 +266,13 @@ class CarbonProject(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Marketplace vintage / methodology filters.
+            models.Index(fields=["methodology", "year", "quarter"]),
+            models.Index(fields=["year", "quarter"]),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -173,6 +310,9 @@ class EmissionReport(models.Model):
 
     estimated_emissions_kg = models.FloatField(null=True, blank=True)
 
+    # EmissionFactor version(s) estimated_emissions_kg was calculated with.
+    emission_factor_version = models.CharField(max_length=255, blank=True, null=True)
+
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -182,6 +322,37 @@ class EmissionReport(models.Model):
         return f"{self.user} - {self.year} {self.quarter}"
 
 
+class EmissionFactor(models.Model):
+    """
+    kg CO2e per unit of an activity, for a region over a validity period.
+    Read through core.services.emission_factors, which caches the table
+    per process.
+    """
+
+    activity = models.CharField(max_length=50)
+    region = models.CharField(max_length=50, default="GLOBAL")
+    unit = models.CharField(max_length=20)
+
+    value = models.FloatField()
+
+    # Open-ended when null; valid_to is exclusive.
+    valid_from = models.DateField(null=True, blank=True)
+    valid_to = models.DateField(null=True, blank=True)
+
+    version = models.CharField(max_length=50)
+    source = models.CharField(max_length=255, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["activity", "region", "valid_from"]),
+        ]
+
+    def __str__(self):
+        return f"{self.activity} ({self.region}) {self.value} | {self.version}"
+
+
 class ReductionProjectData(models.Model):
 
     project = models.OneToOneField(
@@ -204,3 +375,53 @@ class ReductionProjectData(models.Model):
 
     def __str__(self):
         return f"Reduction data for {self.project.title}"
+
+
+class BackgroundJob(models.Model):
+    """
+    DB-backed work queue, drained by `manage.py run_jobs`.
+    Handlers are registered in core.services.jobs.
+    """
+
+    STATUS_CHOICES = (
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    )
+
+    kind = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict)
+
+    # Only this user can read the job's status and result.
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="jobs"
+    )
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="queued")
+
+    progress = models.PositiveBigIntegerField(default=0)
+    total = models.PositiveBigIntegerField(null=True, blank=True)
+
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, null=True)
+    attempts = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    # Heartbeat: bumped on every progress report.
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.id} | {self.status}"
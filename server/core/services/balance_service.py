@@ -0,0 +1,185 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, F, Sum
+
+from core.models import CarbonTransaction, CreditLot, CreditState
+
+# ==============================
+# POSTING
+# ==============================
+#
+# Every ledger event writes its user postings to CarbonTransaction and
+# moves User.carbon_balance by the same net amount, in the ledger entry's
+# transaction. These are single-sided postings, not double entry:
+# CarbonTransaction rows belong to a user, and MARKET and RETIRED are
+# system accounts with no user row, so their side of an event is not
+# booked. The hash ledger remains the complete record of every transfer.
+#
+#   MINT    issuer  +q earn, issuer -q sell (listed on the market; nets to 0)
+#   TRADE   buyer   +q buy,  seller -q sell (seller omitted when MARKET)
+#   RETIRE  holder  -q retire
+#
+# The balance therefore always equals the credits the user currently holds.
+# Every user posting also records the event as User.last_ledger_entry_id,
+# even when its net amount is zero (a MINT), so cached responses see the
+# change.
+
+def _is_user_account(entity) -> bool:
+    return str(entity).isdigit()
+
+
+def require_user_account(user_id):
+    """
+    Raises ValueError unless user_id names an existing user; ledger events
+    to a user are posted against that user's row.
+    """
+
+    if not _is_user_account(user_id) or not get_user_model().objects.filter(pk=int(str(user_id))).exists():
+        raise ValueError("Unknown buyer")
+
+
+def user_postings(event_type, from_entity, to_entity, quantity):
+    """
+    The single-sided (user id, amount, transaction type) postings of a
+    ledger event; sides held by system accounts are left out, so the
+    amounts do not sum to zero.
+    """
+
+    if event_type == "MINT":
+        postings = [(from_entity, quantity, "earn"), (from_entity, -quantity, "sell")]
+    elif event_type == "TRADE":
+        postings = [(to_entity, quantity, "buy"), (from_entity, -quantity, "sell")]
+    elif event_type == "RETIRE":
+        postings = [(from_entity, -quantity, "retire")]
+    else:
+        postings = []
+
+    return [
+        (int(entity), amount, transaction_type)
+        for entity, amount, transaction_type in postings
+        if _is_user_account(entity)
+    ]
+
+
+def post_ledger_event(event_type, from_entity, to_entity, quantity, reference_id, entry_id=None):
+    """
+    Writes the user postings of one ledger event (or of a batch
+    of identical ones, e.g. a bulk mint) and applies the net balance change.
+    entry_id is the (last) HashLedgerEntry id of the event.
+    """
+
+    postings = user_postings(event_type, from_entity, to_entity, quantity)
+
+    if not postings:
+        return
+
+    CarbonTransaction.objects.bulk_create([
+        CarbonTransaction(
+            user_id=user_id,
+            amount=amount,
+            transaction_type=transaction_type,
+            description=f"{event_type} {from_entity} -> {to_entity}",
+            reference_id=reference_id
+        )
+        for user_id, amount, transaction_type in postings
+    ])
+
+    net = defaultdict(int)
+    for user_id, amount, _ in postings:
+        net[user_id] += amount
+
+    User = get_user_model()
+
+    for user_id, amount in net.items():
+        updates = {}
+
+        if amount:
+            updates["carbon_balance"] = F("carbon_balance") + amount
+
+        if entry_id is not None:
+            updates["last_ledger_entry_id"] = entry_id
+
+        if updates:
+            User.objects.filter(pk=user_id).update(**updates)
+
+
+def get_wallet_balance(user_id):
+    """
+    Cached balance: a single primary-key lookup.
+    """
+
+    return (
+        get_user_model().objects
+        .filter(pk=user_id)
+        .values_list("carbon_balance", flat=True)
+        .first()
+    )
+
+# ==============================
+# RECONCILIATION
+# ==============================
+
+def get_ledger_holdings():
+    """
+    Returns {user_id: kg currently owned} derived from the state tables.
+    """
+
+    holdings = defaultdict(int)
+
+    credits = (
+        CreditState.objects
+        .filter(status="owned")
+        .values("owner")
+        .annotate(total=Count("id"))
+    )
+
+    lots = (
+        CreditLot.objects
+        .filter(status="owned")
+        .values("owner")
+        .annotate(total=Sum("quantity"))
+    )
+
+    for row in list(credits) + list(lots):
+        if _is_user_account(row["owner"]):
+            holdings[int(row["owner"])] += row["total"]
+
+    return holdings
+
+
+def reconcile_balances(fix=False):
+    """
+    Compares every cached carbon_balance with the ledger holdings.
+    Returns a list of {user_id, cached, ledger}; with fix=True each
+    mismatch is corrected and recorded as an "adjust" transaction.
+    """
+
+    User = get_user_model()
+    holdings = get_ledger_holdings()
+
+    mismatches = []
+
+    for user_id, cached in User.objects.values_list("id", "carbon_balance").iterator():
+        ledger = Decimal(holdings.get(user_id, 0))
+
+        if cached != ledger:
+            mismatches.append({"user_id": user_id, "cached": cached, "ledger": ledger})
+
+    if fix:
+        with transaction.atomic():
+            for mismatch in mismatches:
+                CarbonTransaction.objects.create(
+                    user_id=mismatch["user_id"],
+                    amount=mismatch["ledger"] - mismatch["cached"],
+                    transaction_type="adjust",
+                    description="Reconciled with ledger holdings"
+                )
+
+                User.objects.filter(pk=mismatch["user_id"]).update(
+                    carbon_balance=mismatch["ledger"]
+                )
+
+    return mismatches
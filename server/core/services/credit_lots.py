@@ -0,0 +1,308 @@
+from django.db import transaction
+from django.db.models import Max, Sum
+import uuid
+
+from core.models import CarbonProject, CreditLot, HashLedgerEntry
+from core.services.balance_service import require_user_account
+from core.services.verification_service import create_ledger_entry, credit_state_for_event
+
+# ==============================
+# LOT LEDGER EVENTS
+# ==============================
+#
+# A lot event is an ordinary hash-chained ledger entry whose credit_id is the
+# lot_id and whose metadata carries the serial range. A partial trade or
+# retirement splits the first `quantity` serials off into a new lot; the entry
+# for the new lot names the lot it was split from in "parent_lot", so the
+# CreditLot table can be replayed from the ledger alone.
+
+def lot_metadata(project_id, serial_start, serial_end, parent_lot=None):
+    """
+    The entry hash covers str(metadata), so keys are kept in the order
+    PostgreSQL jsonb returns them (shorter keys first, then bytewise);
+    otherwise a re-hash of the stored row would not match.
+    """
+
+    metadata = {"quantity": serial_end - serial_start + 1}
+
+    if parent_lot:
+        metadata["parent_lot"] = str(parent_lot)
+
+    metadata["project_id"] = project_id
+    metadata["serial_end"] = serial_end
+    metadata["serial_start"] = serial_start
+
+    return metadata
+
+
+def mint_credit_lot(project_id: int):
+    """
+    Mints the project's whole verified reduction as a single lot.
+    """
+
+    project = CarbonProject.objects.get(id=project_id)
+
+    quantity = int(project.estimated_reduction_kg or 0)
+
+    if quantity <= 0:
+        return None
+
+    with transaction.atomic():
+        last_serial = (
+            CreditLot.objects
+            .filter(project=project)
+            .aggregate(last=Max("serial_end"))["last"]
+        ) or 0
+
+        serial_start = last_serial + 1
+        serial_end = last_serial + quantity
+        lot_id = uuid.uuid4()
+
+        entry = create_ledger_entry(
+            event_type="MINT",
+            credit_id=str(lot_id),
+            from_entity=str(project.user_id),
+            to_entity="MARKET",
+            metadata=lot_metadata(project.id, serial_start, serial_end)
+        )
+
+        return CreditLot.objects.create(
+            lot_id=lot_id,
+            project=project,
+            serial_start=serial_start,
+            serial_end=serial_end,
+            quantity=quantity,
+            owner="MARKET",
+            status="market",
+            last_hash=entry.hash
+        )
+
+
+def lot_quantity(quantity):
+    """
+    Request quantity (kg) as a positive int; None means the whole lot.
+    Raises ValueError for anything else.
+    """
+
+    if quantity is None:
+        return None
+
+    if isinstance(quantity, str) and quantity.strip().isdecimal():
+        quantity = int(quantity)
+
+    if isinstance(quantity, bool) or not isinstance(quantity, int) or quantity <= 0:
+        raise ValueError("quantity must be a positive integer")
+
+    return quantity
+
+
+def _move_lot(lot: CreditLot, quantity: int, event_type, from_entity, to_entity):
+    """
+    Moves the first `quantity` serials of a locked lot, splitting it when
+    only part of the lot changes hands. Returns the lot that moved.
+    """
+
+    if quantity <= 0 or quantity > lot.quantity:
+        raise ValueError(f"quantity must be between 1 and {lot.quantity}")
+
+    owner, status = credit_state_for_event(event_type, from_entity, to_entity)
+
+    if quantity == lot.quantity:
+        entry = create_ledger_entry(
+            event_type=event_type,
+            credit_id=str(lot.lot_id),
+            from_entity=from_entity,
+            to_entity=to_entity,
+            metadata=lot_metadata(lot.project_id, lot.serial_start, lot.serial_end)
+        )
+
+        lot.owner = owner
+        lot.status = status
+        lot.last_hash = entry.hash
+        lot.save(update_fields=["owner", "status", "last_hash", "updated_at"])
+
+        return lot
+
+    split_end = lot.serial_start + quantity - 1
+    split_id = uuid.uuid4()
+
+    entry = create_ledger_entry(
+        event_type=event_type,
+        credit_id=str(split_id),
+        from_entity=from_entity,
+        to_entity=to_entity,
+        metadata=lot_metadata(lot.project_id, lot.serial_start, split_end, parent_lot=lot.lot_id)
+    )
+
+    split = CreditLot.objects.create(
+        lot_id=split_id,
+        project_id=lot.project_id,
+        serial_start=lot.serial_start,
+        serial_end=split_end,
+        quantity=quantity,
+        owner=owner,
+        status=status,
+        parent=lot,
+        last_hash=entry.hash
+    )
+
+    lot.serial_start = split_end + 1
+    lot.quantity -= quantity
+    lot.save(update_fields=["serial_start", "quantity", "updated_at"])
+
+    return split
+
+
+def buy_lot_credits(lot_id: str, quantity, buyer_id):
+    """
+    Buys `quantity` kg from a listed lot; the whole lot when quantity is None.
+    """
+
+    quantity = lot_quantity(quantity)
+    require_user_account(buyer_id)
+
+    with transaction.atomic():
+        lot = CreditLot.objects.select_for_update().filter(lot_id=lot_id).first()
+
+        if lot and lot.status == "retired":
+            raise Exception("Credit already retired")
+
+        if not lot or lot.status != "market":
+            raise Exception("Credit not available")
+
+        quantity = lot.quantity if quantity is None else quantity
+
+        return _move_lot(lot, quantity, "TRADE", "MARKET", str(buyer_id))
+
+
+def retire_lot_credits(lot_id: str, quantity, user_id: str):
+
+    quantity = lot_quantity(quantity)
+
+    with transaction.atomic():
+        lot = CreditLot.objects.select_for_update().filter(lot_id=lot_id).first()
+
+        if not lot:
+            raise Exception("Credit does not exist")
+
+        if lot.status == "retired":
+            raise Exception("Credit already retired")
+
+        if lot.status != "owned" or lot.owner != user_id:
+            raise Exception("You do not own this credit")
+
+        quantity = lot.quantity if quantity is None else quantity
+
+        return _move_lot(lot, quantity, "RETIRE", user_id, "RETIRED")
+
+# ==============================
+# LOT AGGREGATES
+# ==============================
+
+LOT_FIELDS = ("lot_id", "project_id", "serial_start", "serial_end", "quantity")
+
+
+def get_user_owned_lots(user_id: str):
+    return list(
+        CreditLot.objects
+        .filter(owner=user_id, status="owned")
+        .order_by("project_id", "serial_start")
+        .values(*LOT_FIELDS)
+    )
+
+
+def get_user_lot_totals(user_id: str):
+    """
+    Returns {"owned": kg, "retired": kg} summed over the user's lots.
+    """
+
+    totals = {"owned": 0, "retired": 0}
+
+    rows = (
+        CreditLot.objects
+        .filter(owner=user_id, status__in=totals.keys())
+        .values("status")
+        .annotate(total=Sum("quantity"))
+    )
+
+    for row in rows:
+        totals[row["status"]] = row["total"]
+
+    return totals
+
+# ==============================
+# REBUILD
+# ==============================
+
+def rebuild_credit_lots(chunk_size: int = 2000) -> int:
+    """
+    Replays lot events in id order and replaces the CreditLot table.
+    Returns the number of lots written.
+    """
+
+    lots = {}
+
+    entries = (
+        HashLedgerEntry.objects
+        .filter(metadata__has_key="serial_start")
+        .order_by("id")
+        .values_list("credit_id", "event_type", "from_entity", "to_entity", "metadata", "hash")
+    )
+
+    for lot_id, event_type, from_entity, to_entity, metadata, entry_hash in entries.iterator(chunk_size=chunk_size):
+        owner, status = credit_state_for_event(event_type, from_entity, to_entity)
+
+        parent_id = metadata.get("parent_lot")
+
+        if parent_id:
+            parent_id = uuid.UUID(parent_id)
+            parent = lots[parent_id]
+            parent["serial_start"] = metadata["serial_end"] + 1
+            parent["quantity"] -= metadata["quantity"]
+
+        lot = lots.setdefault(lot_id, {"project_id": metadata["project_id"], "parent": parent_id})
+        lot.update(
+            serial_start=metadata["serial_start"],
+            serial_end=metadata["serial_end"],
+            quantity=metadata["quantity"],
+            owner=owner,
+            status=status,
+            last_hash=entry_hash
+        )
+
+    existing_projects = set(CarbonProject.objects.values_list("id", flat=True))
+
+    with transaction.atomic():
+        CreditLot.objects.all().delete()
+
+        created = CreditLot.objects.bulk_create(
+            [
+                CreditLot(
+                    lot_id=lot_id,
+                    project_id=lot["project_id"],
+                    serial_start=lot["serial_start"],
+                    serial_end=lot["serial_end"],
+                    quantity=lot["quantity"],
+                    owner=lot["owner"],
+                    status=lot["status"],
+                    last_hash=lot["last_hash"]
+                )
+                for lot_id, lot in lots.items()
+                if lot["project_id"] in existing_projects
+            ],
+            batch_size=chunk_size
+        )
+
+        pks = {lot.lot_id: lot.pk for lot in created}
+
+        for lot in created:
+            parent_id = lots[lot.lot_id]["parent"]
+            lot.parent_id = pks.get(parent_id) if parent_id else None
+
+        CreditLot.objects.bulk_update(
+            [lot for lot in created if lot.parent_id],
+            ["parent"],
+            batch_size=chunk_size
+        )
+
+    return len(created)
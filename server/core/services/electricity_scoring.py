@@ -0,0 +1,33 @@
+import json
+from itertools import islice
+
+from ai_engine.electricity.score_batch import iter_score_rows, score_electricity_batch
+
+# At ~100 bytes a record this stays inside Django's default
+# DATA_UPLOAD_MAX_MEMORY_SIZE (2.5 MB) for the request body.
+SCORE_BATCH_MAX_RECORDS = 20000
+
+# Result lines sent per chunk of the streamed response
+NDJSON_CHUNK_ROWS = 1000
+
+_encode = json.JSONEncoder(separators=(",", ":")).encode
+
+
+def score_electricity_records(records):
+    """
+    Scores {kwh, state, period, auditor_emission_kg} records with the
+    electricity engine in one vectorized pass. Returns an iterator of
+    NDJSON text chunks, one line per record in input order; invalid
+    records get {"index", "error"} lines.
+    """
+
+    rows = iter_score_rows(score_electricity_batch(records))
+
+    def chunks():
+        while True:
+            lines = [_encode(row) + "\n" for row in islice(rows, NDJSON_CHUNK_ROWS)]
+            if not lines:
+                return
+            yield "".join(lines)
+
+    return chunks()
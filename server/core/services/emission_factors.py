@@ -0,0 +1,223 @@
+import time
+from collections import namedtuple
+from datetime import date
+
+from django.db.models import Count, F, Max
+from django.utils import timezone
+
+from core.models import EmissionFactor
+
+GLOBAL_REGION = "GLOBAL"
+
+# Region used for EmissionReports, which carry no location of their own.
+DEFAULT_REGION = "IN"
+
+# State-level grid factors are stored as electricity rows for "IN-<state>"
+# (ISO 3166-2:IN), one per month via valid_from/valid_to.
+STATE_REGION_PREFIX = "IN-"
+
+# How often a process re-reads the table's version stamp. Lookups in
+# between are plain dict hits.
+FACTOR_CACHE_CHECK_SECONDS = 30
+
+# EmissionReport activity field -> EmissionFactor.activity, in summation order.
+REPORT_ACTIVITIES = {
+    "electricity_kwh": "electricity",
+    "diesel_liters": "diesel",
+    "petrol_liters": "petrol",
+    "natural_gas_m3": "natural_gas",
+    "flight_km": "flight_economy",
+    "car_km": "car",
+    "waste_kg": "waste",
+    "recycled_waste_kg": "waste_recycled",
+}
+
+Factor = namedtuple("Factor", ["value", "version"])
+
+# ==============================
+# PROCESS CACHE
+# ==============================
+#
+# The whole table is small, so each process keeps it in memory indexed by
+# (activity, region). The version stamp is the row count plus the latest
+# updated_at: any insert, edit (including through the admin) or delete
+# changes it, and the next check after that reloads the table.
+
+_cache = {
+    "stamp": None,
+    "checked_at": float("-inf"),
+    "rows": {},
+    "resolved": {},
+    "today": None,
+}
+
+# Called after the table is reloaded (or the year rolls over), so tables
+# derived from it can rebuild.
+_reload_listeners = []
+
+
+def factor_table_stamp():
+    stamp = EmissionFactor.objects.aggregate(count=Count("id"), updated=Max("updated_at"))
+    return (stamp["count"], stamp["updated"])
+
+
+def invalidate_factor_cache():
+    """
+    Forces the next lookup to re-check the version stamp.
+    """
+
+    _cache["checked_at"] = float("-inf")
+
+
+def _refresh_factor_cache():
+
+    now = time.monotonic()
+
+    if now - _cache["checked_at"] < FACTOR_CACHE_CHECK_SECONDS:
+        return
+
+    stamp = factor_table_stamp()
+
+    if stamp != _cache["stamp"]:
+        rows = {}
+
+        # Latest valid_from first, so the newest overlapping factor wins.
+        factors = EmissionFactor.objects.order_by(
+            "activity", "region", F("valid_from").desc(nulls_last=True)
+        ).values_list(
+            "activity", "region", "valid_from", "valid_to", "value", "version"
+        )
+
+        for activity, region, valid_from, valid_to, value, version in factors:
+            rows.setdefault((activity, region), []).append((valid_from, valid_to, Factor(value, version)))
+
+        _cache["rows"] = rows
+        _cache["resolved"] = {}
+        _cache["stamp"] = stamp
+        reloaded = True
+    else:
+        reloaded = False
+
+    today = timezone.localdate()
+
+    if _cache["today"] is not None and today.year != _cache["today"].year:
+        reloaded = True
+
+    _cache["today"] = today
+    _cache["checked_at"] = now
+
+    if reloaded:
+        for listener in _reload_listeners:
+            listener()
+
+
+def _resolve(activity, region, on):
+
+    for candidate in (region, GLOBAL_REGION):
+        for valid_from, valid_to, factor in _cache["rows"].get((activity, candidate), ()):
+            if (valid_from is None or valid_from <= on) and (valid_to is None or on < valid_to):
+                return factor
+
+    raise Exception(f"No emission factor for {activity} in {region} on {on}")
+
+# ==============================
+# LOOKUPS
+# ==============================
+
+def get_emission_factor(activity: str, region: str = GLOBAL_REGION, on: date = None) -> Factor:
+    """
+    The factor for activity valid on the given date (today by default),
+    falling back from region to GLOBAL.
+    """
+
+    _refresh_factor_cache()
+
+    if on is None:
+        on = _cache["today"]
+
+    key = (activity, region, on)
+    factor = _cache["resolved"].get(key)
+
+    if factor is None:
+        factor = _cache["resolved"][key] = _resolve(activity, region, on)
+
+    return factor
+
+
+def quarter_start(year: int, quarter: str) -> date:
+    return date(year, 3 * (int(quarter[1]) - 1) + 1, 1)
+
+
+def report_emission_factors(year: int, quarter: str, region: str = DEFAULT_REGION):
+    """
+    Returns ({report field: factor value}, version) for a reporting quarter.
+    version lists every distinct factor version used, comma-separated.
+    """
+
+    on = quarter_start(year, quarter)
+
+    factors = {
+        field: get_emission_factor(activity, region, on)
+        for field, activity in REPORT_ACTIVITIES.items()
+    }
+
+    values = {field: factor.value for field, factor in factors.items()}
+    version = ",".join(sorted({factor.version for factor in factors.values()}))
+
+    return values, version
+
+
+def state_grid_factor_rows(year: int = None):
+    """
+    (state code, month, value, version) for every month of the year
+    (the current one by default) that has a state electricity factor,
+    plus ("IN", month, ...) rows with the national factor of each month.
+    State months without a factor are left out, not filled from GLOBAL.
+    """
+
+    _refresh_factor_cache()
+
+    if year is None:
+        year = _cache["today"].year
+
+    rows = []
+
+    for month in range(1, 13):
+        try:
+            factor = _resolve("electricity", DEFAULT_REGION, date(year, month, 1))
+        except Exception:
+            continue
+
+        rows.append((DEFAULT_REGION, month, factor.value, factor.version))
+
+    for (activity, region), factors in _cache["rows"].items():
+        if activity != "electricity" or not region.startswith(STATE_REGION_PREFIX):
+            continue
+
+        for month in range(1, 13):
+            on = date(year, month, 1)
+
+            for valid_from, valid_to, factor in factors:
+                if (valid_from is None or valid_from <= on) and (valid_to is None or on < valid_to):
+                    rows.append((region[len(STATE_REGION_PREFIX):], month, factor.value, factor.version))
+                    break
+
+    return rows
+
+# ==============================
+# AI ENGINE PROVIDER
+# ==============================
+
+def install_engine_factor_provider():
+    """
+    Points the AI engines' factor lookups, including the state grid
+    factors, at this registry.
+    """
+
+    from ai_engine import factors
+
+    factors.set_factor_provider(lambda activity, region: tuple(get_emission_factor(activity, region)))
+    factors.set_grid_factor_provider(state_grid_factor_rows)
+
+    if factors.invalidate_factors not in _reload_listeners:
+        _reload_listeners.append(factors.invalidate_factors)
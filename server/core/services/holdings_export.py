@@ -0,0 +1,208 @@
+import base64
+import csv
+import json
+from itertools import islice
+
+from django.db.models import Q
+
+from core.models import CreditLot, CreditState
+
+# Rows fetched per round trip; on PostgreSQL .iterator() reads through a
+# server-side cursor, so the export never holds more than this many rows.
+HOLDINGS_EXPORT_CHUNK_ROWS = 2000
+
+# Output lines sent per chunk of the streamed response
+EXPORT_CHUNK_LINES = 1000
+
+HOLDINGS_STATUSES = ("owned", "retired")
+
+# CSV header; NDJSON lines use the same keys, leaving out empty ones.
+EXPORT_COLUMNS = ("type", "id", "project_id", "serial_start", "serial_end", "quantity", "lots")
+
+_encode = json.JSONEncoder(separators=(",", ":")).encode
+
+# ==============================
+# CURSORS
+# ==============================
+#
+# An export lists per-kg credits by id, then lots by (project, serial_start).
+# A cursor is the opaque encoding of the last position on a page:
+# "c:<credit row id>" resumes after that credit (then all lots),
+# "l:<project id>:<serial>" resumes with the lots after that serial.
+
+def encode_export_cursor(position: str) -> str:
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+
+def decode_export_cursor(cursor: str):
+    """
+    Returns (credit id or None, (project id, serial) or None).
+    """
+
+    try:
+        kind, *values = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        values = [int(value) for value in values]
+    except (ValueError, UnicodeError):
+        raise ValueError("Invalid cursor")
+
+    if kind == "c" and len(values) == 1:
+        return values[0], None
+
+    if kind == "l" and len(values) == 2:
+        return None, tuple(values)
+
+    raise ValueError("Invalid cursor")
+
+# ==============================
+# ROWS
+# ==============================
+#
+# Each generator yields (position, row) pairs, position being what a
+# cursor taken after that row encodes.
+
+def _credit_rows(user_id, status, after_id):
+
+    queryset = CreditState.objects.filter(owner=user_id, status=status)
+
+    if after_id is not None:
+        queryset = queryset.filter(id__gt=after_id)
+
+    credits = (
+        queryset
+        .order_by("id")
+        .values_list("id", "credit_id", "project_id")
+        .iterator(chunk_size=HOLDINGS_EXPORT_CHUNK_ROWS)
+    )
+
+    for row_id, credit_id, project_id in credits:
+        yield f"c:{row_id}", {"type": "credit", "id": str(credit_id), "project_id": project_id}
+
+
+def _lots(user_id, status, after):
+
+    queryset = CreditLot.objects.filter(owner=user_id, status=status)
+
+    if after is not None:
+        project_id, serial = after
+        queryset = queryset.filter(
+            Q(project_id__gt=project_id) | Q(project_id=project_id, serial_start__gt=serial)
+        )
+
+    return (
+        queryset
+        .order_by("project_id", "serial_start")
+        .values_list("lot_id", "project_id", "serial_start", "serial_end", "quantity")
+        .iterator(chunk_size=HOLDINGS_EXPORT_CHUNK_ROWS)
+    )
+
+
+def _lot_rows(user_id, status, after):
+
+    for lot_id, project_id, serial_start, serial_end, quantity in _lots(user_id, status, after):
+        yield f"l:{project_id}:{serial_end}", {
+            "type": "lot",
+            "id": str(lot_id),
+            "project_id": project_id,
+            "serial_start": serial_start,
+            "serial_end": serial_end,
+            "quantity": quantity,
+        }
+
+
+def _range_rows(user_id, status, after):
+    """
+    Lots of one project whose serials follow on without a gap, merged into
+    one "range" row with the number of lots it covers.
+    """
+
+    current = None
+
+    for _, project_id, serial_start, serial_end, quantity in _lots(user_id, status, after):
+
+        if current and current["project_id"] == project_id and current["serial_end"] + 1 == serial_start:
+            current["serial_end"] = serial_end
+            current["quantity"] += quantity
+            current["lots"] += 1
+            continue
+
+        if current:
+            yield f"l:{current['project_id']}:{current['serial_end']}", current
+
+        current = {
+            "type": "range",
+            "project_id": project_id,
+            "serial_start": serial_start,
+            "serial_end": serial_end,
+            "quantity": quantity,
+            "lots": 1,
+        }
+
+    if current:
+        yield f"l:{current['project_id']}:{current['serial_end']}", current
+
+
+def iter_holdings(user_id: str, status="owned", compact=False, cursor=None, limit=None):
+    """
+    The user's per-kg credits, then their lots (as merged ranges when
+    compact), as row dicts. With a limit, at most that many rows are
+    returned, followed by {"type": "next", "id": cursor} when more remain.
+    Raises ValueError for a bad status or cursor.
+    """
+
+    if status not in HOLDINGS_STATUSES:
+        raise ValueError(f"status must be one of {', '.join(HOLDINGS_STATUSES)}")
+
+    after_credit, after_lot = decode_export_cursor(cursor) if cursor else (None, None)
+
+    def rows():
+        if after_lot is None:
+            yield from _credit_rows(user_id, status, after_credit)
+
+        lot_rows = _range_rows if compact else _lot_rows
+        yield from lot_rows(user_id, status, after_lot)
+
+    def page():
+        items = rows()
+        position = None
+
+        for position, row in islice(items, limit):
+            yield row
+
+        # One row of lookahead tells whether another page exists
+        if limit is not None and position is not None and next(items, None) is not None:
+            yield {"type": "next", "id": encode_export_cursor(position)}
+
+    return page()
+
+# ==============================
+# ENCODINGS
+# ==============================
+
+def _chunks(lines):
+    while True:
+        chunk = list(islice(lines, EXPORT_CHUNK_LINES))
+        if not chunk:
+            return
+        yield "".join(chunk)
+
+
+def ndjson_chunks(rows):
+    return _chunks(_encode(row) + "\n" for row in rows)
+
+
+class _LineBuffer:
+    # csv.writer target that hands each written line back
+    def write(self, line):
+        return line
+
+
+def csv_chunks(rows):
+    writer = csv.writer(_LineBuffer())
+
+    def lines():
+        yield writer.writerow(EXPORT_COLUMNS)
+
+        for row in rows:
+            yield writer.writerow([row.get(column, "") for column in EXPORT_COLUMNS])
+
+    return _chunks(lines())
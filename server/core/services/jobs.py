@@ -0,0 +1,118 @@
+from datetime import timedelta
+
+from django.db.models import F
+from django.utils import timezone
+
+from core.models import BackgroundJob, CarbonProject
+from core.services.verification_service import verify_reduction_project
+
+# kind -> handler(job, report_progress) returning a JSON-serialisable result.
+JOB_HANDLERS = {}
+
+
+def job_handler(kind):
+    def register(func):
+        JOB_HANDLERS[kind] = func
+        return func
+    return register
+
+# ==============================
+# QUEUE
+# ==============================
+
+def enqueue_job(kind: str, payload: dict, user=None) -> BackgroundJob:
+
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+
+    return BackgroundJob.objects.create(kind=kind, payload=payload, user=user)
+
+
+def claim_next_job():
+    """
+    Claims the oldest queued job for this worker, or returns None.
+    The claim is a conditional UPDATE, so two workers racing for the same
+    row cannot both win, on SQLite as well as PostgreSQL.
+    """
+
+    candidates = (
+        BackgroundJob.objects
+        .filter(status="queued")
+        .order_by("id")
+        .values_list("id", flat=True)[:10]
+    )
+
+    for job_id in candidates:
+        now = timezone.now()
+
+        claimed = BackgroundJob.objects.filter(id=job_id, status="queued").update(
+            status="running",
+            started_at=now,
+            updated_at=now,
+            attempts=F("attempts") + 1
+        )
+
+        if claimed:
+            return BackgroundJob.objects.get(id=job_id)
+
+    return None
+
+
+def requeue_stale_jobs(stale_after: timedelta) -> int:
+    """
+    Puts running jobs whose heartbeat is older than stale_after back in
+    the queue (their worker died). Handlers must be safe to re-run.
+    """
+
+    return BackgroundJob.objects.filter(
+        status="running",
+        updated_at__lt=timezone.now() - stale_after
+    ).update(status="queued", updated_at=timezone.now())
+
+
+def run_job(job: BackgroundJob) -> bool:
+
+    def report_progress(done, total):
+        BackgroundJob.objects.filter(id=job.id).update(
+            progress=done,
+            total=total,
+            updated_at=timezone.now()
+        )
+
+    try:
+        result = JOB_HANDLERS[job.kind](job, report_progress)
+    except Exception as exc:
+        BackgroundJob.objects.filter(id=job.id).update(
+            status="failed",
+            error=str(exc),
+            finished_at=timezone.now(),
+            updated_at=timezone.now()
+        )
+        return False
+
+    BackgroundJob.objects.filter(id=job.id).update(
+        status="done",
+        result=result,
+        error=None,
+        finished_at=timezone.now(),
+        updated_at=timezone.now()
+    )
+    return True
+
+# ==============================
+# HANDLERS
+# ==============================
+
+@job_handler("verify_reduction")
+def verify_reduction_job(job, report_progress):
+    project_id = job.payload["project_id"]
+
+    try:
+        reduction_kg = verify_reduction_project(project_id, on_progress=report_progress)
+    except Exception:
+        # run_job records the error on the job; the project must not be
+        # left "processing". A requeued run moves it back to processing.
+        CarbonProject.objects.filter(pk=project_id).update(ai_status="failed")
+        raise
+
+    return {"reduction_kg": reduction_kg}
@@ -0,0 +1,209 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.db import connections
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from core.models import HashLedgerEntry, LedgerCheckpoint
+from core.services.verification_service import generate_hash, ledger_data_string
+
+CHECKPOINT_SALT = "core.ledger_checkpoint"
+
+# Cap on errors kept in a report; the total is always counted.
+MAX_REPORTED_ERRORS = 100
+
+# ==============================
+# CHECKPOINTS
+# ==============================
+
+def sign_checkpoint(entry_id: int, entry_hash: str) -> str:
+    return salted_hmac(CHECKPOINT_SALT, f"{entry_id}:{entry_hash}", algorithm="sha256").hexdigest()
+
+
+def is_checkpoint_valid(checkpoint: LedgerCheckpoint) -> bool:
+    return constant_time_compare(
+        checkpoint.signature,
+        sign_checkpoint(checkpoint.entry_id, checkpoint.hash)
+    )
+
+
+def save_checkpoints(boundaries):
+    LedgerCheckpoint.objects.bulk_create(
+        [
+            LedgerCheckpoint(
+                entry_id=entry_id,
+                hash=entry_hash,
+                signature=sign_checkpoint(entry_id, entry_hash)
+            )
+            for entry_id, entry_hash in boundaries
+        ],
+        ignore_conflicts=True
+    )
+
+# ==============================
+# CHAIN VERIFICATION
+# ==============================
+
+def verify_range(after_id, prev_hash, until_id=None, chunk_size=2000, checkpoint_every=None):
+    """
+    Streams entries with after_id < id <= until_id in id order and
+    re-hashes each one starting from prev_hash.
+
+    Returns a dict with the number of entries verified, the last id and hash
+    seen, the errors found and, when checkpoint_every is set, the
+    (entry_id, hash) boundaries at which a checkpoint may be written.
+    """
+
+    entries = HashLedgerEntry.objects.filter(id__gt=after_id)
+
+    if until_id is not None:
+        entries = entries.filter(id__lte=until_id)
+
+    entries = entries.order_by("id").values_list(
+        "id", "event_type", "credit_id", "from_entity", "to_entity", "metadata", "prev_hash", "hash"
+    )
+
+    result = {
+        "verified": 0,
+        "last_id": after_id,
+        "last_hash": prev_hash,
+        "error_count": 0,
+        "errors": [],
+        "boundaries": [],
+    }
+
+    def report(entry_id, error):
+        result["error_count"] += 1
+        if len(result["errors"]) < MAX_REPORTED_ERRORS:
+            result["errors"].append({"entry_id": entry_id, "error": error})
+
+    expected_prev = prev_hash
+
+    for entry_id, event_type, credit_id, from_entity, to_entity, metadata, stored_prev, stored_hash in entries.iterator(chunk_size=chunk_size):
+
+        if stored_prev != expected_prev:
+            report(entry_id, "prev_hash does not link to previous entry")
+
+        recomputed = generate_hash(
+            ledger_data_string(event_type, credit_id, from_entity, to_entity, metadata, stored_prev)
+        )
+
+        if recomputed != stored_hash:
+            report(entry_id, "hash does not match entry contents")
+
+        # Continue from the stored hash so one bad row is reported once.
+        expected_prev = stored_hash
+
+        result["verified"] += 1
+
+        if checkpoint_every and result["verified"] % checkpoint_every == 0:
+            result["boundaries"].append((entry_id, stored_hash))
+
+    if result["verified"]:
+        result["last_id"] = entry_id
+        result["last_hash"] = expected_prev
+
+        if checkpoint_every and result["boundaries"][-1:] != [(entry_id, expected_prev)]:
+            result["boundaries"].append((entry_id, expected_prev))
+
+    return result
+
+
+def _init_worker():
+    django.setup()
+
+
+def _verify_segment(args):
+    return verify_range(*args)
+
+
+def verify_ledger(full=False, workers=1, chunk_size=2000, checkpoint_every=100000, write_checkpoints=True):
+    """
+    Verifies the hash chain, by default only the tail after the latest
+    valid checkpoint. With full=True everything is re-verified; with
+    workers > 1 the segments between existing checkpoints are verified in
+    parallel processes, each seeded with its checkpoint's hash.
+    """
+
+    summary = {
+        "verified": 0,
+        "start_id": 0,
+        "last_id": 0,
+        "error_count": 0,
+        "errors": [],
+        "checkpoints_written": 0,
+    }
+
+    def merge_errors(errors, count):
+        summary["error_count"] += count
+        room = MAX_REPORTED_ERRORS - len(summary["errors"])
+        summary["errors"].extend(errors[:max(room, 0)])
+
+    checkpoints = []
+
+    for checkpoint in LedgerCheckpoint.objects.order_by("entry_id"):
+        if is_checkpoint_valid(checkpoint):
+            checkpoints.append(checkpoint)
+        else:
+            merge_errors([{"entry_id": checkpoint.entry_id, "error": "checkpoint signature invalid"}], 1)
+
+    start_id, start_hash = 0, "GENESIS"
+
+    if not full and checkpoints:
+        anchor = checkpoints[-1]
+        anchor_hash = (
+            HashLedgerEntry.objects
+            .filter(id=anchor.entry_id)
+            .values_list("hash", flat=True)
+            .first()
+        )
+
+        if anchor_hash == anchor.hash:
+            start_id, start_hash = anchor.entry_id, anchor.hash
+        else:
+            merge_errors([{"entry_id": anchor.entry_id, "error": "checkpoint does not match ledger"}], 1)
+
+    summary["start_id"] = start_id
+
+    if full and workers > 1 and checkpoints:
+        bounds = [(0, "GENESIS")] + [(cp.entry_id, cp.hash) for cp in checkpoints]
+        segments = [
+            (after_id, prev_hash, bounds[i + 1][0], chunk_size)
+            for i, (after_id, prev_hash) in enumerate(bounds[:-1])
+        ]
+        segments.append(bounds[-1] + (None, chunk_size, checkpoint_every))
+
+        # Children must open their own connections, not share the parent's.
+        connections.close_all()
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            results = list(pool.map(_verify_segment, segments))
+
+        tail = results[-1]
+
+        for i, result in enumerate(results[:-1]):
+            expected_id, expected_hash = bounds[i + 1]
+
+            if (result["last_id"], result["last_hash"]) != (expected_id, expected_hash):
+                merge_errors([{"entry_id": expected_id, "error": "segment does not end at its checkpoint"}], 1)
+
+        for result in results:
+            summary["verified"] += result["verified"]
+            merge_errors(result["errors"], result["error_count"])
+
+        summary["last_id"] = tail["last_id"]
+        new_boundaries = tail["boundaries"]
+    else:
+        result = verify_range(start_id, start_hash, None, chunk_size, checkpoint_every)
+
+        summary["verified"] = result["verified"]
+        summary["last_id"] = result["last_id"]
+        merge_errors(result["errors"], result["error_count"])
+
+        new_boundaries = result["boundaries"]
+
+    if write_checkpoints and summary["error_count"] == 0 and new_boundaries:
+        save_checkpoints(new_boundaries)
+        summary["checkpoints_written"] = len(new_boundaries)
+
+    return summary
@@ -0,0 +1,93 @@
+import base64
+
+from core.models import CarbonProject, CreditLot, CreditState
+from core.services.credit_lots import LOT_FIELDS
+
+MARKETPLACE_PAGE_SIZE = 50
+MARKETPLACE_MAX_PAGE_SIZE = 200
+
+# Filters answered from CarbonProject; project_id is matched directly.
+PROJECT_FILTERS = ("methodology", "year", "quarter")
+
+# ==============================
+# CURSORS
+# ==============================
+#
+# Listings are ordered newest first by primary key. A cursor is the opaque
+# encoding of the last id on a page; the next page is `id < cursor`, which
+# the (status, id) and (status, project, id) indexes answer directly, so a
+# page costs the same however deep it is.
+
+def encode_cursor(last_id: int) -> str:
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        return int(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (ValueError, UnicodeError):
+        raise ValueError("Invalid cursor")
+
+
+def _filter_listings(queryset, filters):
+
+    if filters.get("project"):
+        queryset = queryset.filter(project_id=filters["project"])
+
+    project_filters = {
+        field: filters[field]
+        for field in PROJECT_FILTERS
+        if filters.get(field)
+    }
+
+    if project_filters:
+        queryset = queryset.filter(
+            project_id__in=CarbonProject.objects.filter(**project_filters).values("id")
+        )
+
+    return queryset
+
+
+def _keyset_page(queryset, fields, cursor, limit):
+
+    if cursor:
+        queryset = queryset.filter(id__lt=decode_cursor(cursor))
+
+    rows = list(queryset.order_by("-id").values("id", *fields)[:limit + 1])
+
+    next_cursor = encode_cursor(rows[limit - 1]["id"]) if len(rows) > limit else None
+
+    for row in rows:
+        del row["id"]
+
+    return rows[:limit], next_cursor
+
+# ==============================
+# LISTINGS
+# ==============================
+
+def get_marketplace_page(filters=None, cursor=None, limit=MARKETPLACE_PAGE_SIZE):
+    """
+    One page of per-kg credits on the market.
+    Returns (credits, next_cursor); next_cursor is None on the last page.
+    """
+
+    queryset = _filter_listings(
+        CreditState.objects.filter(status="market"),
+        filters or {}
+    )
+
+    return _keyset_page(queryset, ("credit_id", "project_id"), cursor, limit)
+
+
+def get_marketplace_lot_page(filters=None, cursor=None, limit=MARKETPLACE_PAGE_SIZE):
+    """
+    One page of credit lots on the market, same contract as get_marketplace_page.
+    """
+
+    queryset = _filter_listings(
+        CreditLot.objects.filter(status="market"),
+        filters or {}
+    )
+
+    return _keyset_page(queryset, LOT_FIELDS, cursor, limit)
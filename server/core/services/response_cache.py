@@ -0,0 +1,77 @@
+from django.core.cache import caches
+
+from core.models import LedgerHead
+from core.services.verification_service import LEDGER_HEAD_ID
+
+# Cache alias holding per-user responses. With several server processes
+# this must be a shared backend (file, Redis, Memcached): a local-memory
+# cache still never serves stale data, but each process warms its own.
+RESPONSE_CACHE_ALIAS = "default"
+
+# Entries of superseded versions are never read again and simply expire.
+RESPONSE_CACHE_SECONDS = 300
+
+# ==============================
+# PER-USER RESPONSE CACHE
+# ==============================
+#
+# Keys carry the user's last_ledger_entry_id, which every ledger event the
+# user takes part in advances in the event's own transaction
+# (balance_service.post_ledger_event). A new event therefore changes the
+# key instead of invalidating anything, and the version is read from the
+# user row the request has already loaded.
+
+def user_response_key(name: str, user) -> str:
+    return f"response:{name}:{user.pk}:{user.last_ledger_entry_id or 0}"
+
+
+def cached_user_response(name: str, user, build):
+    """
+    Returns build() for the user, computed once per ledger version.
+    """
+
+    cache = caches[RESPONSE_CACHE_ALIAS]
+    key = user_response_key(name, user)
+
+    value = cache.get(key)
+
+    if value is None:
+        value = build()
+        cache.set(key, value, RESPONSE_CACHE_SECONDS)
+
+    return value
+
+# ==============================
+# ETAGS
+# ==============================
+#
+# Strong validators for conditional GETs, built from the same versions so
+# a 304 can be answered before any service query runs. Listings shared by
+# all users follow the chain head, which every ledger append advances;
+# per-user responses follow the user's last_ledger_entry_id.
+
+def _etag(*parts) -> str:
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+
+def ledger_etag(name: str, *parts) -> str:
+    """
+    ETag that changes with every ledger append; one primary-key read.
+    """
+
+    head = (
+        LedgerHead.objects
+        .filter(pk=LEDGER_HEAD_ID)
+        .values_list("length", "last_hash")
+        .first()
+    ) or (0, "GENESIS")
+
+    return _etag(name, head[0], head[1][:16], *parts)
+
+
+def user_etag(name: str, user, *parts) -> str:
+    """
+    ETag that changes with every ledger event of the user; no query.
+    """
+
+    return _etag(name, user.pk, user.last_ledger_entry_id or 0, *parts)
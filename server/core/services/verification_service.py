@@ -1,4 +1,10 @@
-from core.models import CarbonProject, ReductionProjectData, HashLedgerEntry, EmissionReport
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+
+from core.models import CarbonProject, ReductionProjectData, HashLedgerEntry, EmissionReport, CreditState, LedgerHead
+from core.services.balance_service import post_ledger_event, require_user_account
+from core.services.emission_factors import REPORT_ACTIVITIES, report_emission_factors
 import uuid
 import hashlib
 
@@ -16,13 +22,20 @@ def calculate_reduction(reduction_data: ReductionProjectData) -> float:
 
     return 0
 
-def verify_reduction_project(project_id: int):
+def verify_reduction_project(project_id: int, on_progress=None):
+    """
+    Moves the project through processing -> approved, minting its credits
+    in between. on_progress is passed to mint_credits_for_project.
+    """
 
     project = CarbonProject.objects.get(id=project_id)
 
     if project.submission_type != "reduction":
         return
 
+    project.ai_status = "processing"
+    project.save(update_fields=["ai_status"])
+
     reduction_data = project.reduction_data
 
     reduction_kg = calculate_reduction(reduction_data)
@@ -31,89 +44,368 @@ def verify_reduction_project(project_id: int):
     reduction_data.save()
 
     project.estimated_reduction_kg = reduction_kg
-    project.ai_status = "approved"
-    project.save()
+    project.save(update_fields=["estimated_reduction_kg"])
+
+    if getattr(settings, "CREDIT_LOTS_ENABLED", False):
+        from core.services.credit_lots import mint_credit_lot
 
-    mint_credits_for_project(project.id)
+        # A lot is minted in one transaction; a resumed run must not mint it
+        # twice, nor a requeued run racing the original worker.
+        with transaction.atomic():
+            lock_project(project.id)
+
+            if on_progress is None or not project.credit_lots.exists():
+                mint_credit_lot(project.id)
+
+        if on_progress:
+            on_progress(int(reduction_kg), int(reduction_kg))
+    else:
+        mint_credits_for_project(project.id, on_progress=on_progress)
+
+    project.ai_status = "approved"
+    project.save(update_fields=["ai_status"])
 
     return reduction_kg
 
+# Ledger rows written per bulk_create when minting.
+MINT_BATCH_SIZE = 5000
+
+LEDGER_HEAD_ID = 1
+
 def get_last_hash():
-    last_entry = HashLedgerEntry.objects.order_by("-timestamp").first()
-    return last_entry.hash if last_entry else "GENESIS"
+    head_hash = (
+        LedgerHead.objects
+        .filter(pk=LEDGER_HEAD_ID)
+        .values_list("last_hash", flat=True)
+        .first()
+    )
+    return head_hash or "GENESIS"
+
+
+def lock_chain_head() -> LedgerHead:
+    """
+    Locks the chain head for the rest of the current transaction.
+    Must be called inside transaction.atomic().
+
+    SQLite ignores SELECT ... FOR UPDATE, so a no-op UPDATE first takes the
+    database write lock; concurrent writers then queue on it instead of
+    reading the same prev_hash.
+    """
+
+    if not connection.features.has_select_for_update:
+        LedgerHead.objects.filter(pk=LEDGER_HEAD_ID).update(length=F("length"))
+
+    head = LedgerHead.objects.select_for_update().filter(pk=LEDGER_HEAD_ID).first()
+
+    if head is None:
+        # Seeded by migration 0006; only missing if the table was emptied.
+        last_entry = HashLedgerEntry.objects.order_by("-id").first()
+
+        head, _ = LedgerHead.objects.select_for_update().get_or_create(
+            pk=LEDGER_HEAD_ID,
+            defaults={
+                "last_hash": last_entry.hash if last_entry else "GENESIS",
+                "last_entry_id": last_entry.pk if last_entry else None,
+                "length": HashLedgerEntry.objects.count(),
+            }
+        )
+
+    return head
+
+
+def advance_chain_head(head: LedgerHead, last_entry: HashLedgerEntry, appended: int):
+
+    head.last_hash = last_entry.hash
+    head.last_entry_id = last_entry.pk
+    head.length += appended
+    head.save(update_fields=["last_hash", "last_entry_id", "length", "updated_at"])
 
 
 def generate_hash(data_string: str) -> str:
     return hashlib.sha256(data_string.encode()).hexdigest()
 
+
+def ledger_data_string(event_type, credit_id, from_entity, to_entity, metadata, prev_hash) -> str:
+    return f"{event_type}{credit_id}{from_entity}{to_entity}{metadata}{prev_hash}"
+
+
 def create_ledger_entry(event_type, credit_id, from_entity, to_entity, metadata):
 
-    prev_hash = get_last_hash()
+    with transaction.atomic():
+        head = lock_chain_head()
+        prev_hash = head.last_hash
 
-    data_string = f"{event_type}{credit_id}{from_entity}{to_entity}{metadata}{prev_hash}"
+        data_string = ledger_data_string(event_type, credit_id, from_entity, to_entity, metadata, prev_hash)
 
-    new_hash = generate_hash(data_string)
+        new_hash = generate_hash(data_string)
 
-    HashLedgerEntry.objects.create(
-        event_type=event_type,
-        credit_id=credit_id,
-        from_entity=from_entity,
-        to_entity=to_entity,
-        metadata=metadata,
-        prev_hash=prev_hash,
-        hash=new_hash
+        entry = HashLedgerEntry.objects.create(
+            event_type=event_type,
+            credit_id=credit_id,
+            from_entity=from_entity,
+            to_entity=to_entity,
+            metadata=metadata,
+            prev_hash=prev_hash,
+            hash=new_hash
+        )
+
+        advance_chain_head(head, entry, 1)
+
+        if is_lot_entry(metadata):
+            quantity = metadata["quantity"]
+        else:
+            quantity = 1
+            apply_entry_to_credit_state(entry)
+
+        post_ledger_event(event_type, from_entity, to_entity, quantity, new_hash, entry.id)
+
+    return entry
+
+# ==============================
+# CREDIT STATE PROJECTION
+# ==============================
+
+def is_lot_entry(metadata) -> bool:
+    """
+    Lot events (see credit_lots) carry a serial range; their projection
+    is CreditLot rather than CreditState.
+    """
+    return bool(metadata) and "serial_start" in metadata
+
+
+def credit_state_for_event(event_type, from_entity, to_entity):
+    """
+    Maps a ledger event to the (owner, status) it leaves the credit in.
+    """
+
+    if event_type == "RETIRE":
+        return from_entity, "retired"
+
+    if to_entity == "MARKET":
+        return to_entity, "market"
+
+    return to_entity, "owned"
+
+
+def apply_entry_to_credit_state(entry: HashLedgerEntry):
+
+    owner, status = credit_state_for_event(
+        entry.event_type, entry.from_entity, entry.to_entity
     )
 
-def mint_credits_for_project(project_id: int):
+    if entry.event_type == "MINT":
+        CreditState.objects.create(
+            credit_id=entry.credit_id,
+            owner=owner,
+            status=status,
+            project_id=entry.metadata.get("project_id"),
+            last_hash=entry.hash
+        )
+        return
 
-    project = CarbonProject.objects.get(id=project_id)
+    CreditState.objects.filter(credit_id=entry.credit_id).update(
+        owner=owner,
+        status=status,
+        last_hash=entry.hash
+    )
 
-    reduction_kg = int(project.estimated_reduction_kg or 0)
 
-    if reduction_kg <= 0:
-        return 0
+def rebuild_credit_state(chunk_size: int = 2000) -> int:
+    """
+    Replays the ledger in id order and replaces the CreditState table.
+    Returns the number of credits written.
+    """
 
-    minted = 0
+    states = {}
 
-    for _ in range(reduction_kg):
-        credit_id = str(uuid.uuid4())
+    entries = (
+        HashLedgerEntry.objects
+        .exclude(metadata__has_key="serial_start")
+        .order_by("id")
+        .values_list("credit_id", "event_type", "from_entity", "to_entity", "metadata", "hash")
+    )
 
-        create_ledger_entry(
+    for credit_id, event_type, from_entity, to_entity, metadata, entry_hash in entries.iterator(chunk_size=chunk_size):
+        owner, status = credit_state_for_event(event_type, from_entity, to_entity)
+
+        project_id = states[credit_id][2] if credit_id in states else None
+        if event_type == "MINT":
+            project_id = (metadata or {}).get("project_id")
+
+        states[credit_id] = (owner, status, project_id, entry_hash)
+
+    existing_projects = set(CarbonProject.objects.values_list("id", flat=True))
+
+    with transaction.atomic():
+        CreditState.objects.all().delete()
+
+        CreditState.objects.bulk_create(
+            (
+                CreditState(
+                    credit_id=credit_id,
+                    owner=owner,
+                    status=status,
+                    project_id=project_id if project_id in existing_projects else None,
+                    last_hash=entry_hash
+                )
+                for credit_id, (owner, status, project_id, entry_hash) in states.items()
+            ),
+            batch_size=chunk_size
+        )
+
+    return len(states)
+
+def chain_mint_entries(credit_ids, from_entity, metadata, prev_hash):
+    """
+    Builds unsaved MINT entries for credit_ids, hash-chained in memory
+    exactly as consecutive create_ledger_entry calls would chain them.
+    Returns (entries, last_hash).
+    """
+
+    entries = []
+
+    for credit_id in credit_ids:
+        new_hash = generate_hash(
+            ledger_data_string("MINT", credit_id, from_entity, "MARKET", metadata, prev_hash)
+        )
+
+        entries.append(HashLedgerEntry(
             event_type="MINT",
             credit_id=credit_id,
-            from_entity=str(project.user.id),
+            from_entity=from_entity,
             to_entity="MARKET",
-            metadata={"project_id": project.id}
+            metadata=metadata,
+            prev_hash=prev_hash,
+            hash=new_hash
+        ))
+
+        prev_hash = new_hash
+
+    return entries, prev_hash
+
+
+def mint_credit_batch(project: CarbonProject, count: int):
+    """
+    Mints `count` credits for the project as one chained bulk write.
+    Must run inside transaction.atomic(). Returns the id of the last
+    CreditState row written.
+    """
+
+    from_entity = str(project.user_id)
+    metadata = {"project_id": project.id}
+
+    head = lock_chain_head()
+
+    credit_ids = [str(uuid.uuid4()) for _ in range(count)]
+
+    entries, last_hash = chain_mint_entries(credit_ids, from_entity, metadata, head.last_hash)
+
+    HashLedgerEntry.objects.bulk_create(entries)
+
+    states = CreditState.objects.bulk_create([
+        CreditState(
+            credit_id=entry.credit_id,
+            owner="MARKET",
+            status="market",
+            project_id=project.id,
+            last_hash=entry.hash
         )
+        for entry in entries
+    ])
 
-        minted += 1
+    advance_chain_head(head, entries[-1], count)
 
-    return minted
+    post_ledger_event("MINT", from_entity, "MARKET", count, last_hash, entries[-1].pk)
 
-def calculate_emissions(report: EmissionReport) -> float:
+    return states[-1].pk
 
-    electricity_emissions = report.electricity_kwh * 0.7
 
-    diesel_emissions = report.diesel_liters * 2.6
-    petrol_emissions = report.petrol_liters * 2.3
-    gas_emissions = report.natural_gas_m3 * 2.0
+def lock_project(project_id: int) -> CarbonProject:
+    """
+    Locks the project row for the rest of the current transaction, the
+    same way lock_chain_head does on SQLite.
+    """
 
-    flight_emissions = report.flight_km * 0.15
-    car_emissions = report.car_km * 0.21
+    if not connection.features.has_select_for_update:
+        CarbonProject.objects.filter(pk=project_id).update(ai_status=F("ai_status"))
 
-    waste_emissions = report.waste_kg * 0.5
-    recycling_offset = report.recycled_waste_kg * 0.3
+    return CarbonProject.objects.select_for_update().get(pk=project_id)
 
-    total = (
-        electricity_emissions
-        + diesel_emissions
-        + petrol_emissions
-        + gas_emissions
-        + flight_emissions
-        + car_emissions
-        + waste_emissions
-        - recycling_offset
-    )
+
+def mint_credits_for_project(project_id: int, batch_size: int = MINT_BATCH_SIZE, on_progress=None):
+    """
+    Mints one credit per kg of verified reduction.
+    Entries are chained in memory and written with bulk_create in chunks,
+    all inside one transaction.
+
+    With on_progress, each chunk commits on its own and
+    on_progress(minted, total) is called after it, so progress is visible
+    to other connections. Credits already minted for the project are
+    skipped, so an interrupted run can simply be repeated.
+    """
+
+    project = CarbonProject.objects.get(id=project_id)
+
+    reduction_kg = int(project.estimated_reduction_kg or 0)
+
+    if reduction_kg <= 0:
+        return 0
+
+    if on_progress is None:
+        minted = 0
+
+        with transaction.atomic():
+            while minted < reduction_kg:
+                size = min(batch_size, reduction_kg - minted)
+                mint_credit_batch(project, size)
+                minted += size
+
+        return minted
+
+    minted_credits = CreditState.objects.filter(project_id=project.id)
+
+    # Counted once; each batch then adds its size.
+    with transaction.atomic():
+        lock_project(project.id)
+        minted = minted_credits.count()
+        seen_id = CreditState.objects.order_by("-id").values_list("id", flat=True).first() or 0
+
+    on_progress(minted, reduction_kg)
+
+    while minted < reduction_kg:
+        with transaction.atomic():
+            lock_project(project.id)
+
+            # A requeued job can run next to a slow worker still minting
+            # the same project. Rows of the project past the last one seen
+            # here mean it did, and only then is a recount needed.
+            if minted_credits.filter(id__gt=seen_id).exists():
+                minted = minted_credits.count()
+
+                if minted >= reduction_kg:
+                    break
+
+            size = min(batch_size, reduction_kg - minted)
+            seen_id = mint_credit_batch(project, size)
+            minted += size
+
+        on_progress(minted, reduction_kg)
+
+    return minted
+
+def calculate_emissions(report: EmissionReport, factors=None) -> float:
+    """
+    factors maps each activity field to kg CO2e per unit; by default the
+    registry's factors for the report's quarter.
+    """
+
+    if factors is None:
+        factors, _ = report_emission_factors(report.year, report.quarter)
+
+    total = 0.0
+
+    for field in REPORT_ACTIVITIES:
+        total += getattr(report, field) * factors[field]
 
     return max(total, 0)
 
@@ -136,94 +428,113 @@ def verify_emission_report(report_id: int):
 
     report = EmissionReport.objects.get(id=report_id)
 
-    emissions_kg = calculate_emissions(report)
+    factors, factor_version = report_emission_factors(report.year, report.quarter)
+
+    emissions_kg = calculate_emissions(report, factors)
     report.estimated_emissions_kg = emissions_kg
+    report.emission_factor_version = factor_version
     report.save()
 
     verification_score = calculate_verification_score(report)
 
     return {
         "emissions_kg": emissions_kg,
-        "verification_score": verification_score
+        "verification_score": verification_score,
+        "emission_factor_version": factor_version
     }
 
+def get_credit_state(credit_id: str):
+    return CreditState.objects.filter(credit_id=credit_id).first()
+
+
+def lock_credit_state(credit_id: str):
+    """
+    Locks the credit's state row for the rest of the current transaction,
+    the same way lock_chain_head does on SQLite. Returns None for an
+    unknown credit.
+    """
+
+    if not connection.features.has_select_for_update:
+        CreditState.objects.filter(credit_id=credit_id).update(status=F("status"))
+
+    return CreditState.objects.select_for_update().filter(credit_id=credit_id).first()
+
+
 def is_credit_retired(credit_id: str) -> bool:
-    return HashLedgerEntry.objects.filter(
+    return CreditState.objects.filter(
         credit_id=credit_id,
-        event_type="RETIRE"
+        status="retired"
     ).exists()
 
 
 def get_current_owner(credit_id: str):
 
-    last_entry = (
-        HashLedgerEntry.objects
-        .filter(credit_id=credit_id)
-        .order_by("-timestamp")
-        .first()
-    )
-
-    return last_entry.to_entity if last_entry else None
+    state = get_credit_state(credit_id)
 
+    if not state:
+        return None
 
-def get_marketplace_credits():
-
-    minted_entries = HashLedgerEntry.objects.filter(
-        event_type="MINT",
-        to_entity="MARKET"
-    ).order_by("-timestamp")
+    return "RETIRED" if state.status == "retired" else state.owner
 
-    credits = []
 
-    for entry in minted_entries:
-        owner = get_current_owner(entry.credit_id)
+def get_marketplace_credits():
 
-        if owner == "MARKET":
-            credits.append({
-                "credit_id": entry.credit_id,
-                "project_id": entry.metadata.get("project_id")
-            })
+    listed = (
+        CreditState.objects
+        .filter(status="market")
+        .order_by("-id")
+        .values_list("credit_id", "project_id")
+    )
 
-    return credits
+    return [
+        {"credit_id": credit_id, "project_id": project_id}
+        for credit_id, project_id in listed
+    ]
 
 
 
 def buy_credit(credit_id: str, buyer_id: int):
 
-    if is_credit_retired(credit_id):
-        raise Exception("Credit already retired")
+    require_user_account(buyer_id)
 
-    owner = get_current_owner(credit_id)
+    # Checked under the row lock: two buyers of the same credit queue here
+    # and the second sees it already sold.
+    with transaction.atomic():
+        state = lock_credit_state(credit_id)
 
-    if owner != "MARKET":
-        raise Exception("Credit not available")
+        if state and state.status == "retired":
+            raise Exception("Credit already retired")
 
-    create_ledger_entry(
-        event_type="TRADE",
-        credit_id=credit_id,
-        from_entity="MARKET",
-        to_entity=str(buyer_id),
-        metadata={}
-    )
+        if not state or state.status != "market":
+            raise Exception("Credit not available")
+
+        create_ledger_entry(
+            event_type="TRADE",
+            credit_id=credit_id,
+            from_entity="MARKET",
+            to_entity=str(buyer_id),
+            metadata={}
+        )
 
 
 def retire_credit(credit_id: str, user_id: int):
 
-    if is_credit_retired(credit_id):
-        raise Exception("Already retired")
+    with transaction.atomic():
+        state = lock_credit_state(credit_id)
 
-    owner = get_current_owner(credit_id)
+        if state and state.status == "retired":
+            raise Exception("Already retired")
 
-    if owner != str(user_id):
-        raise Exception("Not owner")
+        if not state or state.owner != str(user_id):
+            raise Exception("Not owner")
 
-    create_ledger_entry(
-        event_type="RETIRE",
-        credit_id=credit_id,
-        from_entity=str(user_id),
-        to_entity="RETIRED",
-        metadata={}
-    )
+        create_ledger_entry(
+            event_type="RETIRE",
+            credit_id=credit_id,
+            from_entity=str(user_id),
+            to_entity="RETIRED",
+            metadata={}
+        )
 
 # ==============================
 # WALLET / DASHBOARD HELPERS
@@ -233,24 +544,23 @@ def get_user_owned_credits(user_id: str):
     """
     Returns credits currently owned by user (not retired)
     """
-    from core.models import HashLedgerEntry
 
-    owned = HashLedgerEntry.objects.filter(
-        to_entity=user_id
-    ).exclude(event_type="RETIRE")
+    owned = CreditState.objects.filter(
+        owner=user_id,
+        status="owned"
+    ).values_list("credit_id", flat=True)
 
-    return [str(entry.credit_id) for entry in owned]
+    return [str(credit_id) for credit_id in owned]
 
 
 def get_user_retired_credits(user_id: str):
-    from core.models import HashLedgerEntry
 
-    retired = HashLedgerEntry.objects.filter(
-        from_entity=user_id,
-        event_type="RETIRE"
-    )
+    retired = CreditState.objects.filter(
+        owner=user_id,
+        status="retired"
+    ).values_list("credit_id", flat=True)
 
-    return [str(entry.credit_id) for entry in retired]
+    return [str(credit_id) for credit_id in retired]
 
 
 def retire_credit(credit_id: str, user_id: str):
@@ -258,28 +568,22 @@ def retire_credit(credit_id: str, user_id: str):
     Final lifecycle step
     """
 
-    from core.models import HashLedgerEntry
-
-    last_entry = (
-        HashLedgerEntry.objects
-        .filter(credit_id=credit_id)
-        .order_by("-timestamp")
-        .first()
-    )
+    with transaction.atomic():
+        state = lock_credit_state(credit_id)
 
-    if not last_entry:
-        raise Exception("Credit does not exist")
+        if not state:
+            raise Exception("Credit does not exist")
 
-    if last_entry.to_entity != user_id:
-        raise Exception("You do not own this credit")
+        if state.status == "retired":
+            raise Exception("Credit already retired")
 
-    if last_entry.event_type == "RETIRE":
-        raise Exception("Credit already retired")
+        if state.owner != user_id:
+            raise Exception("You do not own this credit")
 
-    create_ledger_entry(
-        event_type="RETIRE",
-        credit_id=credit_id,
-        from_entity=user_id,
-        to_entity="RETIRED",
-        metadata={}
-    )
+        create_ledger_entry(
+            event_type="RETIRE",
+            credit_id=credit_id,
+            from_entity=user_id,
+            to_entity="RETIRED",
+            metadata={}
+        )
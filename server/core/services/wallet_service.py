@@ -0,0 +1,48 @@
+from django.db.models import Count
+
+from core.models import CreditState
+from core.services.credit_lots import get_user_lot_totals
+
+# ==============================
+# WALLET
+# ==============================
+
+def get_user_credit_totals(user_id: str):
+    """
+    Returns {"owned": n, "retired": n} for the user's per-kg credits,
+    counted in SQL from CreditState.
+    """
+
+    totals = {"owned": 0, "retired": 0}
+
+    rows = (
+        CreditState.objects
+        .filter(owner=user_id, status__in=totals.keys())
+        .values("status")
+        .annotate(total=Count("id"))
+    )
+
+    for row in rows:
+        totals[row["status"]] = row["total"]
+
+    return totals
+
+
+def get_wallet_summary(user_id: str):
+    """
+    Current holdings of a user as counts (kg), without materialising any
+    credit ids: one grouped query over CreditState and one over CreditLot,
+    however many credits the user holds.
+    """
+
+    credits = get_user_credit_totals(user_id)
+    lots = get_user_lot_totals(user_id)
+
+    owned = credits["owned"] + lots["owned"]
+    retired = credits["retired"] + lots["retired"]
+
+    return {
+        "owned_credits": owned,
+        "retired_credits": retired,
+        "wallet_balance": owned,
+    }
@@ -2,6 +2,7 @@ from django.urls import path
 from .views import (
     submit_project,
     add_reduction_data,
+    job_status,
     upload_emissions,
     marketplace_credits,
     buy_credit_api,
@@ -11,20 +12,25 @@ from .views import (
 from .views import (
     dashboard_api,
     my_credits_api,
+    export_holdings_api,
     retire_credit_api,
-    verify_emissions_api
+    verify_emissions_api,
+    electricity_score_batch,
 )
 
 
 urlpatterns = [
     path("projects/", submit_project),
     path("reduction-data/", add_reduction_data),
+    path("jobs/<int:job_id>/", job_status),
     path("emissions/", upload_emissions),
     path("marketplace/", marketplace_credits),
     path("buy/", buy_credit_api),
     path("retire/", retire_credit_api),
     path("dashboard/", dashboard_api),
     path("my-credits/", my_credits_api),
+    path("my-credits/export/", export_holdings_api),
     path("retire/", retire_credit_api),
     path("verify-emissions/", verify_emissions_api),
+    path("electricity/score-batch/", electricity_score_batch),
 ]
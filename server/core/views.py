@@ -1,8 +1,10 @@
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from .models import CarbonProject, ReductionProjectData, EmissionReport
+from .models import CarbonProject, ReductionProjectData, EmissionReport, BackgroundJob
 from .serializers import (
     CarbonProjectSerializer,
     ReductionProjectDataSerializer,
@@ -10,14 +12,27 @@ from .serializers import (
 )
 
 from core.services.verification_service import (
-    verify_reduction_project,
     verify_emission_report,
-    get_marketplace_credits,
     buy_credit,
     retire_credit,
     get_user_owned_credits,
-    get_user_retired_credits,
 )
+from core.services.credit_lots import (
+    buy_lot_credits,
+    retire_lot_credits,
+    get_user_owned_lots,
+)
+from core.services.marketplace import (
+    MARKETPLACE_PAGE_SIZE,
+    MARKETPLACE_MAX_PAGE_SIZE,
+    get_marketplace_page,
+    get_marketplace_lot_page,
+)
+from core.services.wallet_service import get_wallet_summary
+from core.services.response_cache import cached_user_response, ledger_etag, user_etag
+from core.services.holdings_export import csv_chunks, iter_holdings, ndjson_chunks
+from core.services.jobs import enqueue_job
+from core.services.electricity_scoring import SCORE_BATCH_MAX_RECORDS, score_electricity_records
 
 # ==============================
 # PROJECT SUBMISSION
@@ -40,12 +55,19 @@ def add_reduction_data(request):
 
     if serializer.is_valid():
         data = serializer.save()
-        reduction_kg = verify_reduction_project(data.project.id)
+
+        project = data.project
+        project.ai_status = "submitted"
+        project.save(update_fields=["ai_status"])
+
+        # Verification and minting run in `manage.py run_jobs`.
+        job = enqueue_job("verify_reduction", {"project_id": project.id}, user=project.user)
 
         return Response({
-            "message": "Project verified",
-            "reduction_kg": reduction_kg
-        })
+            "message": "Project submitted for verification",
+            "project_id": project.id,
+            "job_id": job.id
+        }, status=202)
 
     return Response(serializer.errors)
 
@@ -62,22 +84,115 @@ def upload_emissions(request):
     return Response(serializer.errors)
 
 
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def job_status(request, job_id):
+    # Another user's job reads as missing, so ids cannot be probed.
+    job = BackgroundJob.objects.filter(id=job_id, user=request.user).first()
+
+    if job is None:
+        return Response({"error": "Job not found"}, status=404)
+
+    return Response({
+        "job_id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "progress": job.progress,
+        "total": job.total,
+        "result": job.result,
+        "error": job.error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    })
+
+
+# ==============================
+# CONDITIONAL GET
+# ==============================
+#
+# Read-only endpoints compute their ETag first (see response_cache) and
+# answer a matching If-None-Match with 304 before running any service
+# query. The renderer format is part of the tag, since the JSON and
+# browsable representations differ byte for byte.
+
+def _tagged(response, etag, private=False):
+    response["ETag"] = etag
+    # Clients may keep the body but must revalidate before reusing it.
+    if private:
+        patch_cache_control(response, no_cache=True, private=True)
+    else:
+        patch_cache_control(response, no_cache=True)
+    return response
+
+
 # ==============================
 # MARKETPLACE
 # ==============================
 
+def _marketplace_filters(params):
+    filters = {
+        "methodology": params.get("methodology"),
+        "quarter": params.get("quarter"),
+    }
+
+    for field in ("project", "year"):
+        value = params.get(field)
+        if value:
+            if not value.isdigit():
+                raise ValueError(f"{field} must be an integer")
+            filters[field] = int(value)
+
+    return filters
+
+
 @api_view(["GET"])
 def marketplace_credits(request):
-    credits = get_marketplace_credits()
-    return Response({"available_credits": credits[:50]})
+    """
+    Keyset-paginated listings. Filters: project, methodology, year, quarter.
+    Pass next_cursor / next_lot_cursor back as cursor / lot_cursor.
+    """
+    params = request.query_params
+
+    etag = ledger_etag("marketplace", request.accepted_renderer.format)
+
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified:
+        return _tagged(not_modified, etag)
+
+    try:
+        filters = _marketplace_filters(params)
+        limit = params.get("limit", str(MARKETPLACE_PAGE_SIZE))
+        if not limit.isdigit() or int(limit) < 1:
+            raise ValueError("limit must be a positive integer")
+        limit = min(int(limit), MARKETPLACE_MAX_PAGE_SIZE)
+
+        credits, next_cursor = get_marketplace_page(filters, params.get("cursor"), limit)
+        lots, next_lot_cursor = get_marketplace_lot_page(filters, params.get("lot_cursor"), limit)
+    except ValueError as exc:
+        return Response({"error": str(exc)}, status=400)
+
+    return _tagged(Response({
+        "available_credits": credits,
+        "next_cursor": next_cursor,
+        "available_lots": lots,
+        "next_lot_cursor": next_lot_cursor,
+    }), etag)
 
 
 @api_view(["POST"])
 def buy_credit_api(request):
     credit_id = request.data.get("credit_id")
+    lot_id = request.data.get("lot_id")
     buyer_id = request.data.get("buyer_id")
 
-    buy_credit(credit_id, buyer_id)
+    try:
+        if lot_id:
+            buy_lot_credits(lot_id, request.data.get("quantity"), buyer_id)
+        else:
+            buy_credit(credit_id, buyer_id)
+    except ValueError as exc:
+        return Response({"error": str(exc)}, status=400)
 
     return Response({"message": "Credit purchased"})
 
@@ -91,31 +206,100 @@ def buy_credit_api(request):
 def dashboard_api(request):
     user_id = str(request.user.id)
 
-    owned = get_user_owned_credits(user_id)
-    retired = get_user_retired_credits(user_id)
+    # The balance is in the tag too: reconcile_balances can correct it
+    # without a ledger event.
+    etag = user_etag("dashboard", request.user, request.user.carbon_balance, request.accepted_renderer.format)
 
-    return Response({
-        "owned_credits": len(owned),
-        "retired_credits": len(retired),
-        "wallet_balance": len(owned) - len(retired)
-    })
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified:
+        return _tagged(not_modified, etag, private=True)
+
+    summary = dict(cached_user_response("dashboard", request.user, lambda: get_wallet_summary(user_id)))
+
+    # Cached running balance, maintained by the ledger postings. Credits
+    # are whole kg, so it stays an integer count like owned_credits.
+    summary["wallet_balance"] = int(request.user.carbon_balance)
+
+    return _tagged(Response(summary), etag, private=True)
 
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def my_credits_api(request):
     user_id = str(request.user.id)
-    credits = get_user_owned_credits(user_id)
 
-    return Response({"credits": credits})
+    etag = user_etag("my_credits", request.user, request.accepted_renderer.format)
+
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified:
+        return _tagged(not_modified, etag, private=True)
+
+    def build():
+        return {"credits": get_user_owned_credits(user_id), "lots": get_user_owned_lots(user_id)}
+
+    return _tagged(Response(cached_user_response("my_credits", request.user, build)), etag, private=True)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def export_holdings_api(request):
+    """
+    Streams the user's holdings as NDJSON, or CSV with output=csv.
+    Filters: status (owned / retired). compact=1 merges lots with adjoining
+    serials into ranges; with limit, a last "next" row holds the cursor
+    to pass back as cursor.
+    """
+    params = request.query_params
+
+    output = params.get("output", "ndjson")
+    if output not in ("ndjson", "csv"):
+        return Response({"error": "output must be ndjson or csv"}, status=400)
+
+    etag = user_etag("holdings", request.user)
+
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified:
+        return _tagged(not_modified, etag, private=True)
+
+    try:
+        limit = params.get("limit")
+        if limit is not None:
+            if not limit.isdigit() or int(limit) < 1:
+                raise ValueError("limit must be a positive integer")
+            limit = int(limit)
+
+        rows = iter_holdings(
+            str(request.user.id),
+            status=params.get("status", "owned"),
+            compact=params.get("compact") in ("1", "true"),
+            cursor=params.get("cursor"),
+            limit=limit,
+        )
+    except ValueError as exc:
+        return Response({"error": str(exc)}, status=400)
+
+    if output == "csv":
+        response = StreamingHttpResponse(csv_chunks(rows), content_type="text/csv")
+        response["Content-Disposition"] = 'attachment; filename="holdings.csv"'
+    else:
+        response = StreamingHttpResponse(ndjson_chunks(rows), content_type="application/x-ndjson")
+
+    return _tagged(response, etag, private=True)
 
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def retire_credit_api(request):
     credit_id = request.data.get("credit_id")
+    lot_id = request.data.get("lot_id")
 
-    retire_credit(credit_id, str(request.user.id))
+    if lot_id:
+        try:
+            retire_lot_credits(lot_id, request.data.get("quantity"), str(request.user.id))
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=400)
+    else:
+        retire_credit(credit_id, str(request.user.id))
 
     return Response({"message": "Credit retired successfully"})
 
@@ -132,3 +316,24 @@ def verify_emissions_api(request):
     result = verify_emission_report(report_id)
 
     return Response(result)
+
+
+# ==============================
+# ELECTRICITY BATCH SCORING
+# ==============================
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def electricity_score_batch(request):
+    records = request.data
+
+    if isinstance(records, dict):
+        records = records.get("records")
+
+    if not isinstance(records, list):
+        return Response({"error": "Expected a list of records"}, status=400)
+
+    if len(records) > SCORE_BATCH_MAX_RECORDS:
+        return Response({"error": f"At most {SCORE_BATCH_MAX_RECORDS} records per batch"}, status=400)
+
+    return StreamingHttpResponse(score_electricity_records(records), content_type="application/x-ndjson")
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-18 10:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='last_ledger_entry_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -30,6 +30,10 @@ class User(AbstractBaseUser, PermissionsMixin):
         default=0.00
     )
 
+    # Latest ledger event the user is a party to, set with carbon_balance.
+    # Versions the user's cached responses (core.services.response_cache).
+    last_ledger_entry_id = models.BigIntegerField(null=True, blank=True)
+
     role = models.CharField(max_length=10, choices=ROLE_CHOICES, default="sme")
     is_verified = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True)